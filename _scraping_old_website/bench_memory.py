@@ -0,0 +1,83 @@
+"""Fail if a scraper's peak memory grows with the size of the crawl.
+
+Runs each scraper against the fixture server twice, as bench_scrapers
+does: once on the recorded data and once on a synthetic crawl scaled up
+with --people and --publications. Both runs use --memory-report, so the
+scraper traces its own Python allocations. A scraper that keeps pages or
+parse trees alive peaks roughly in proportion to the pages it fetched.
+The homepage (alumni and tools) is a single page whose size follows the
+data, so the scaled crawl keeps the recorded one and only the team and
+publication pages multiply. The script exits with status 1 if the scaled
+peak is more than --max-growth times the recorded one, or if either peak
+is over --max-peak-mib, so it can run as a regression check.
+
+    python bench_memory.py [--people N --publications N] [--max-growth X] [--max-peak-mib N] [scraper ...]
+"""
+import argparse
+import sys
+
+import fixtures
+from bench_scrapers import SCRAPERS, fixture_site, load_data, run_scraper
+
+SCALED_PEOPLE = 300
+SCALED_PUBLICATIONS = 3000
+# The scaled crawl fetches about 10 times the pages; bounded scrapers peak
+# at most 2.5 times higher (listing pages get longer pagination), a leak
+# about 10 times
+MAX_GROWTH = 4.0
+MAX_PEAK_MIB = 16
+
+
+def measure(data, scrapers, verbose):
+    """Return {scraper: (requests served, peak traced bytes)} for a crawl of `data`."""
+    results = {}
+    with fixture_site(data) as (server, workdir, team_file, _):
+        for name in scrapers:
+            result = run_scraper(name, server, workdir, team_file, verbose, extra_args=['--memory-report'])
+            results[name] = (result['requests'], result['traced_peak'])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scrapers', nargs='*', help=f"scrapers to run: {', '.join(SCRAPERS)} (default: all)")
+    parser.add_argument('--people', type=int, default=SCALED_PEOPLE,
+                        help=f"team members in the scaled crawl (default: {SCALED_PEOPLE})")
+    parser.add_argument('--publications', type=int, default=SCALED_PUBLICATIONS,
+                        help=f"publications in the scaled crawl (default: {SCALED_PUBLICATIONS})")
+    parser.add_argument('--max-growth', type=float, default=MAX_GROWTH,
+                        help=f"highest scaled/recorded peak ratio allowed (default: {MAX_GROWTH})")
+    parser.add_argument('--max-peak-mib', type=float, default=MAX_PEAK_MIB,
+                        help=f"highest peak traced memory allowed in either crawl (default: {MAX_PEAK_MIB})")
+    parser.add_argument('-v', '--verbose', action='store_true', help="show the scrapers' own output")
+    args = parser.parse_args()
+    unknown = set(args.scrapers) - set(SCRAPERS)
+    if unknown:
+        parser.error(f"unknown scrapers: {', '.join(sorted(unknown))}")
+    scrapers = args.scrapers or list(SCRAPERS)
+
+    recorded = load_data()
+    scaled = fixtures.synthetic_data(args.people, args.publications, recorded)
+    print(f"recorded: {len(recorded['team'])} people, {len(recorded['publications'])} publications; "
+          f"scaled: {args.people} people, {args.publications} publications")
+    print(f"limits: {args.max_growth:g}x growth, {args.max_peak_mib:g} MiB peak\n")
+    small = measure(recorded, scrapers, args.verbose)
+    large = measure(scaled, scrapers, args.verbose)
+
+    failed = []
+    print(f"{'scraper':<14} {'pages':>7} {'peak MiB':>9} {'scaled pages':>13} {'peak MiB':>9} {'growth':>7}")
+    for name in scrapers:
+        (small_pages, small_peak), (large_pages, large_peak) = small[name], large[name]
+        growth = large_peak / max(small_peak, 1)
+        over = growth > args.max_growth or large_peak / 2**20 > args.max_peak_mib or small_peak / 2**20 > args.max_peak_mib
+        if over:
+            failed.append(name)
+        print(f"{name:<14} {small_pages:>7} {small_peak / 2**20:>9.1f} {large_pages:>13} {large_peak / 2**20:>9.1f} "
+              f"{growth:>6.1f}x" + ('  OVER LIMIT' if over else ''))
+    if failed:
+        print(f"\nPeak memory over the limits for: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
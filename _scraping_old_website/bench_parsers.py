@@ -0,0 +1,90 @@
+"""Compare HTML parser backends on fixture pages of every scraper.
+
+Reports parse time and peak memory per backend, with and without partial
+parsing, and checks that every configuration produces the same JSON.
+
+    python bench_parsers.py [--pages DIR] [--repeat N]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import fixtures
+import parsing
+from scrape_alumni import parse_alumni
+from scrape_publications import parse_publications_page
+from scrape_team import parse_person_page
+from scrape_tools import find_resources, parse_tool_info
+
+
+def person_name(html):
+    # Fixture and live person pages carry the name in the title
+    start = html.index('<title>') + len('<title>')
+    return html[start:html.index('</title>', start)].split('|')[0].strip()
+
+
+def run_scrapers(pages):
+    """Parse every page the way the scrapers do and return their outputs as JSON data."""
+    home = pages['/']
+    listing = [path for path in pages if path.startswith('/publication/')]
+    return {
+        'alumni': [alumnus.to_dict() for alumnus in parse_alumni(home)],
+        'tools': [parse_tool_info(div)[0].to_dict() for div in find_resources(home)],
+        'team': [
+            parse_person_page(html, person_name(html))[0].to_dict()
+            for path, html in sorted(pages.items()) if path.startswith('/person/')
+        ],
+        'publications': [
+            pub.to_dict()
+            for path in sorted(listing, key=fixtures.publication_page_number)
+            for pub in parse_publications_page(pages[path])[0]
+        ],
+    }
+
+
+def measure(pages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = run_scrapers(pages)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    run_scrapers(pages)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', help="directory of saved pages (default: rebuild from the recorded JSON)")
+    parser.add_argument('--repeat', type=int, default=3, help="timing runs per configuration, best is reported")
+    args = parser.parse_args()
+
+    pages = fixtures.load_pages(args.pages) if args.pages else fixtures.build_pages()
+    print(f"{len(pages)} pages, {sum(len(html) for html in pages.values()) / 1024:.0f} KiB of HTML\n")
+    print(f"{'parser':<12} {'mode':<8} {'time (s)':>10} {'peak (MiB)':>11}  output")
+
+    reference = None
+    identical = True
+    for name in parsing.available_parsers():
+        for partial in (False, True):
+            if partial and name == 'html5lib':
+                continue  # html5lib cannot parse partially
+            parsing.configure(parser=name, partial=partial)
+            elapsed, peak, output = measure(pages, args.repeat)
+            encoded = json.dumps(output, sort_keys=True, ensure_ascii=False)
+            if reference is None:
+                reference = encoded
+            same = encoded == reference
+            identical = identical and same
+            mode = 'partial' if partial else 'full'
+            print(f"{name:<12} {mode:<8} {elapsed:>10.3f} {peak / 2**20:>11.1f}  {'identical' if same else 'DIFFERS'}")
+
+    if not identical:
+        raise SystemExit("Parser backends produced different output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Compare the single-pass person page parser with the old multi-pass one.
+
+Runs both over the person fixture pages, plus a copy of each page whose
+email is only in the page text (to exercise the regex fallback), checks
+the results are identical and prints timings and the per-field profile.
+
+    python bench_person_pages.py [--pages DIR] [--repeat N]
+"""
+import argparse
+import re
+import time
+
+import fetch
+import fixtures
+import parsing
+import scrape_team
+from bench_parsers import person_name
+
+
+def legacy_parse_person_page(html, name):
+    """The multi-pass parser parse_person_page replaced, kept for comparison."""
+    soup = parsing.make_soup(html)
+    
+    # Initialize result dictionary
+    result = {
+        "name": name,
+        "description": "",
+        "research_interests": "",
+        "professional_career": [],
+        "education": [],
+        "email": "",
+        "telephone": "",
+        "orcid": "",
+        "image": ""
+    }
+    
+    # Extract image URL, downloaded by the caller
+    image_url = ""
+    img = soup.find('img', class_='img-responsive')
+    if img and 'src' in img.attrs:
+        image_url = img['src']
+        if image_url.startswith('/'):
+            image_url = fetch.site_url(image_url)
+    
+    # Extract description
+    desc_div = soup.find('div', class_='desc')
+    if desc_div:
+        result["description"] = scrape_team.extract_text_from_element(desc_div)
+    
+    # Extract research interests
+    research_section = soup.find('h3', string='Research Interests')
+    if research_section:
+        next_p = research_section.find_next('p')
+        if next_p:
+            result["research_interests"] = scrape_team.extract_text_from_element(next_p)
+    
+    # Extract professional career
+    career_section = soup.find('h3', string='Professional Career')
+    if career_section:
+        table = career_section.find_next('table')
+        if table:
+            for row in table.find_all('tr'):
+                cols = row.find_all('td')
+                if len(cols) == 2:
+                    result["professional_career"].append({
+                        "period": cols[0].get_text(strip=True),
+                        "position": cols[1].get_text(strip=True)
+                    })
+    
+    # Extract education
+    education_section = soup.find('h3', string='Education')
+    if education_section:
+        table = education_section.find_next('table')
+        if table:
+            for row in table.find_all('tr'):
+                cols = row.find_all('td')
+                if len(cols) == 2:
+                    result["education"].append({
+                        "period": cols[0].get_text(strip=True),
+                        "degree": cols[1].get_text(strip=True)
+                    })
+    
+    # Extract contact information
+    contact_divs = soup.find_all('div', class_='contact')
+    for contact in contact_divs:
+        # Extract telephone
+        tel_link = contact.find('a', href=lambda x: x and x.startswith('tel:'))
+        if tel_link:
+            result["telephone"] = tel_link.get_text(strip=True).replace('Direct:', '').strip()
+    
+        # Extract ORCID
+        orcid_link = contact.find('a', href=lambda x: x and 'orcid.org' in str(x))
+        if orcid_link:
+            orcid_text = orcid_link.get_text(strip=True)
+            # Extract ORCID ID (format: 0000-0000-0000-0000)
+            orcid_match = re.search(r'\d{4}-\d{4}-\d{4}-\d{4}', orcid_text)
+            if orcid_match:
+                result["orcid"] = orcid_match.group(0)
+            else:
+                result["orcid"] = orcid_text
+    
+        # Extract email from imMail spans
+        im_mail = contact.find('span', class_='imMail')
+        if im_mail:
+            # First try to get the email from the text content
+            email_text = im_mail.get_text(strip=True)
+            if '@' in email_text:
+                result["email"] = email_text
+            # If no email in text, try to construct from data-mail attribute
+            elif 'data-mail' in im_mail.attrs:
+                data_mail = im_mail['data-mail']
+                # The format is usually "domain.foo_bar.username"
+                parts = data_mail.split('.')
+                if len(parts) >= 3:
+                    domain = parts[0].replace('_', '.')
+                    username = parts[-1].replace('_', '.')
+                    result["email"] = f"{username}@{domain}"
+    
+    # If no email found in imMail spans, try regex on the entire page
+    if not result["email"]:
+        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+        page_text = soup.get_text()
+        email_matches = re.findall(email_pattern, page_text)
+        if email_matches:
+            result["email"] = email_matches[0]
+    
+    return result, image_url
+
+
+def load_cases(pages):
+    cases = []
+    for path, html in sorted(pages.items()):
+        if not path.startswith('/person/'):
+            continue
+        name = person_name(html)
+        cases.append((html, name))
+        # Same page with the email moved out of the imMail span into plain text
+        cases.append((re.sub(r'<span class="imMail">([^<]*)</span>', r'Contact: \1', html), name))
+    return cases
+
+
+def best_time(parse, cases, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html, name in cases:
+            parse(html, name)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', help="directory of saved pages (default: rebuild from the recorded JSON)")
+    parser.add_argument('--repeat', type=int, default=5, help="timing runs, best is reported")
+    args = parser.parse_args()
+
+    pages = fixtures.load_pages(args.pages) if args.pages else fixtures.build_pages()
+    cases = load_cases(pages)
+
+    mismatches = 0
+    profile = {}
+    for html, name in cases:
+        person, image_url = scrape_team.parse_person_page(html, name, profile)
+        if (person.to_dict(), image_url) != legacy_parse_person_page(html, name):
+            mismatches += 1
+            print(f"MISMATCH for {name}")
+    print(f"{len(cases)} pages, {len(cases) - mismatches} identical\n")
+
+    for label, parse in (('multi-pass', legacy_parse_person_page), ('single-pass', scrape_team.parse_person_page)):
+        elapsed = best_time(parse, cases, args.repeat)
+        print(f"{label:<12} {elapsed * 1000 / len(cases):7.3f} ms/page")
+
+    print("\nsingle-pass profile (ms/page):")
+    for field, seconds in sorted(profile.items(), key=lambda item: -item[1]):
+        print(f"  {field:<20} {seconds * 1000 / len(cases):7.3f}")
+
+    if mismatches:
+        raise SystemExit("Person page output changed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark the scrapers end to end against a local fixture server.
+
+Each scraper runs as its own process, pointed at the server with
+--base-url, so its peak RSS is its own. Reports wall time, requests/sec,
+bytes transferred and peak RSS per scraper. The synthetic options scale
+the recorded data up to see how the scrapers grow with data size.
+
+    python bench_scrapers.py [--pages DIR] [--people N --publications N] [scraper ...]
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+
+import fixtures
+import memory
+from fixture_server import FixtureServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRAPERS = {
+    'alumni': 'scrape_alumni.py',
+    'tools': 'scrape_tools.py',
+    'team': 'scrape_team.py',
+    'publications': 'scrape_publications.py',
+}
+RESULT_MARKER = '__bench_result__ '
+
+
+def run_child(script, script_args):
+    """Run a scraper in this process and report its wall time and peak RSS."""
+    sys.argv = [script, *script_args]
+    sys.path.insert(0, HERE)
+    start = time.perf_counter()
+    runpy.run_path(os.path.join(HERE, script), run_name='__main__')
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result = {'wall': elapsed, 'peak_rss_kb': peak_kb}
+    if memory.active():
+        # Run with --memory-report: the scraper traced its allocations
+        result['traced_peak'] = memory.peak()
+    print(RESULT_MARKER + json.dumps(result), flush=True)
+
+
+def run_scraper(name, server, workdir, team_file, verbose, parse_workers=0, extra_args=()):
+    script_args = ['--base-url', server.url, '--no-delay', *extra_args]
+    if name in ('team', 'publications', 'tools'):
+        script_args += ['--rate', '0']
+    if name in ('team', 'publications'):
+        script_args += ['--parse-workers', str(parse_workers)]
+    if name == 'team':
+        script_args += ['--team-file', team_file]
+    server.reset_stats()
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', SCRAPERS[name], *script_args],
+        cwd=workdir, capture_output=True, text=True,
+    )
+    if verbose or completed.returncode:
+        sys.stderr.write(completed.stdout + completed.stderr)
+    if completed.returncode:
+        raise SystemExit(f"{name} scraper failed")
+    result_line = next(line for line in completed.stdout.splitlines() if line.startswith(RESULT_MARKER))
+    result = json.loads(result_line[len(RESULT_MARKER):])
+    result.update(requests=server.requests, bytes=server.bytes_sent)
+    return result
+
+
+def load_data(people=None, publications=None):
+    """The recorded data, scaled up if `people` or `publications` is given."""
+    data = fixtures.load_recorded()
+    if people or publications:
+        data = fixtures.synthetic_data(people or len(data['team']), publications or len(data['publications']), data)
+    return data
+
+
+@contextlib.contextmanager
+def fixture_site(data, pages_dir=None):
+    """Serve `data` (or the saved pages in `pages_dir`); yields (server, workdir, team file, pages)."""
+    with tempfile.TemporaryDirectory() as workdir, FixtureServer({}) as server:
+        if pages_dir:
+            pages = fixtures.load_pages(pages_dir)
+        else:
+            pages = fixtures.build_pages(data, base_url=server.url)
+        server.routes = fixtures.build_routes(pages)
+
+        team_file = os.path.join(workdir, 'team.json')
+        with open(team_file, 'w', encoding='utf-8') as f:
+            json.dump({'current': [{'name': person['name']} for person in data['team']]}, f)
+        yield server, workdir, team_file, pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scrapers', nargs='*', help=f"scrapers to run: {', '.join(SCRAPERS)} (default: all)")
+    parser.add_argument('--pages', help="directory of saved pages (default: rebuild from the recorded JSON)")
+    parser.add_argument('--people', type=int, help="synthetic mode: number of team members")
+    parser.add_argument('--publications', type=int, help="synthetic mode: number of publications")
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help="team and publications: parse in this many processes while pages download")
+    parser.add_argument('-v', '--verbose', action='store_true', help="show the scrapers' own output")
+    args = parser.parse_args()
+    unknown = set(args.scrapers) - set(SCRAPERS)
+    if unknown:
+        parser.error(f"unknown scrapers: {', '.join(sorted(unknown))}")
+
+    data = load_data(args.people, args.publications)
+    with fixture_site(data, args.pages) as (server, workdir, team_file, pages):
+        print(f"{len(data['team'])} people, {len(data['publications'])} publications, "
+              f"{len(pages)} pages served from {server.url}\n")
+        print(f"{'scraper':<14} {'wall (s)':>9} {'requests':>9} {'req/s':>8} {'MiB sent':>8} {'peak RSS':>9}")
+        for name in args.scrapers or SCRAPERS:
+            result = run_scraper(name, server, workdir, team_file, args.verbose, args.parse_workers)
+            rate = result['requests'] / result['wall'] if result['wall'] else 0
+            print(f"{name:<14} {result['wall']:>9.2f} {result['requests']:>9} {rate:>8.1f} "
+                  f"{result['bytes'] / 2**20:>8.2f} {result['peak_rss_kb'] / 1024:>7.0f}Mi")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--child']:
+        # Internal: bench_scrapers.py --child <script> <script args...>
+        run_child(sys.argv[2], sys.argv[3:])
+    else:
+        main()
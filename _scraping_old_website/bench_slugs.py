@@ -0,0 +1,70 @@
+"""Check slugs against the golden list and time them against the old code.
+
+slugs_golden.json holds the slug the original scrape_team.clean_name gave
+every name in src/content/_team/team.json and every recorded tool; this
+script fails if slugs.slugify disagrees with any of them.
+
+    python bench_slugs.py [--number N]
+"""
+import argparse
+import json
+import os
+import re
+import timeit
+
+import slugs
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_PATH = os.path.join(HERE, 'slugs_golden.json')
+
+
+def legacy_clean_name(name):
+    # The per-call implementation slugs.slugify replaced, kept for timing
+    special_cases = {
+        "Jan Lanzer": "jan-david-lanzer",
+        "Thorben Söhngen": "thorben-hennig"
+    }
+    if name in special_cases:
+        return special_cases[name]
+    name = name.lower()
+    char_map = dict(slugs.CHAR_MAP)
+    for char, replacement in char_map.items():
+        name = name.replace(char, replacement)
+    name = re.sub(r'[^a-z0-9\s-]', '', name)
+    return '-'.join(name.split())
+
+
+def check_golden():
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        golden = json.load(f)
+    mismatches = {name: (slug, slugs.slugify(name)) for name, slug in golden.items() if slugs.slugify(name) != slug}
+    for name, (expected, actual) in mismatches.items():
+        print(f"MISMATCH {name!r}: expected {expected!r}, got {actual!r}")
+    print(f"Golden slugs: {len(golden) - len(mismatches)}/{len(golden)} unchanged")
+    return list(golden), not mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=200, help="passes over all names per timing")
+    args = parser.parse_args()
+
+    names, ok = check_golden()
+    calls = args.number * len(names)
+
+    def run_all(function):
+        return lambda: [function(name) for name in names]
+
+    legacy = min(timeit.repeat(run_all(legacy_clean_name), number=args.number, repeat=3))
+    slugs.slugify.cache_clear()
+    cold = min(timeit.repeat(lambda: [slugs.slugify.__wrapped__(name) for name in names], number=args.number, repeat=3))
+    warm = min(timeit.repeat(run_all(slugs.slugify), number=args.number, repeat=3))
+    for label, seconds in (('legacy clean_name', legacy), ('slugify (uncached)', cold), ('slugify (cached)', warm)):
+        print(f"{label:<20} {seconds / calls * 1e6:8.2f} µs/name")
+
+    if not ok:
+        raise SystemExit("Slugs changed")
+
+
+if __name__ == "__main__":
+    main()
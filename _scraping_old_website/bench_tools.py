@@ -0,0 +1,103 @@
+"""Benchmark scrape_tools against a local fixture server as the number of resources grows.
+
+For each size the homepage lists that many resources (the recorded tools,
+repeated under new names) and every icon is served with --latency added,
+to stand in for the real server. Three runs are timed:
+
+- serial: the old loop, which downloaded each icon inline and then paused
+  --delay seconds after every resource
+- batched: scrape_tools.main, parsing everything first and then
+  downloading the icons --workers at a time under a --rate limit
+- unlimited: the same without a rate limit
+
+The serial and batched records are checked to be identical.
+
+    python bench_tools.py [--sizes N ...] [--latency S] [--delay S] [--rate N] [--workers N]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import fetch
+import fixtures
+import images
+import scrape_tools
+from fixture_server import FixtureServer
+
+
+def legacy_scrape_tools(image_dir, delay):
+    """The one-resource-at-a-time loop main() replaced, kept for comparison."""
+    response = fetch.get_shared(fetch.site_url("#tools"))
+    response.raise_for_status()
+    tools = []
+    for resource_div in scrape_tools.find_resources(response.text):
+        tool, image_url = scrape_tools.parse_tool_info(resource_div)
+        if image_url:
+            try:
+                filename = scrape_tools.image_filename(image_url, tool.name)
+                tool.image = images.get_store(image_dir).save(image_url, filename)
+            except Exception as e:
+                print(f"Error downloading image for {tool.name}: {e}")
+        tools.append(tool.to_dict())
+        fetch.pause(delay)  # Be nice to the server
+    return tools
+
+
+def timed(function, verbose):
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(None if verbose else output):
+        result = function()
+    return result, time.perf_counter() - start
+
+
+def run_size(server, size, args, workdir):
+    data = fixtures.synthetic_data(0, 0, tools=size)
+    server.routes = fixtures.build_routes(fixtures.build_pages(data, base_url=server.url))
+    fetch.configure(base_url=server.url, rate_limit=None)
+
+    # Old loop: no rate limit, the pause was its politeness
+    serial_dir = os.path.join(workdir, f'serial-{size}')
+    server.reset_stats()
+    serial, serial_time = timed(lambda: legacy_scrape_tools(serial_dir, args.delay), args.verbose)
+    results = {'serial': (serial_time, server.requests)}
+
+    for name, rate in (('batched', args.rate), ('unlimited', 0)):
+        output_path = os.path.join(workdir, f'{name}-{size}.json')
+        server.reset_stats()
+        _, seconds = timed(lambda: scrape_tools.main(output_path=output_path,
+                                                     image_dir=os.path.join(workdir, f'{name}-{size}'),
+                                                     workers=args.workers, rate=rate), args.verbose)
+        results[name] = (seconds, server.requests)
+        with open(output_path, encoding='utf-8') as f:
+            if json.load(f) != serial:
+                raise SystemExit(f"{name} run with {size} resources differs from the serial run")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[12, 36, 72], help="numbers of resources to try")
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds the server takes per response")
+    parser.add_argument('--delay', type=float, default=0.3, help="pause after each resource in the serial run")
+    parser.add_argument('--rate', type=float, default=3.0, help="requests per second allowed in the batched run")
+    parser.add_argument('--workers', type=int, default=4, help="images downloaded in parallel")
+    parser.add_argument('-v', '--verbose', action='store_true', help="show the scrapers' own output")
+    args = parser.parse_args()
+
+    print(f"latency {args.latency * 1000:.0f} ms, serial pause {args.delay} s, "
+          f"batched at {args.rate} req/s with {args.workers} workers\n")
+    print(f"{'resources':>9} {'requests':>9} {'serial (s)':>11} {'batched (s)':>12} {'unlimited (s)':>14}")
+    with tempfile.TemporaryDirectory() as workdir, FixtureServer({}, latency=args.latency) as server:
+        for size in args.sizes:
+            results = run_size(server, size, args, workdir)
+            print(f"{size:>9} {results['serial'][1]:>9} {results['serial'][0]:>11.2f} "
+                  f"{results['batched'][0]:>12.2f} {results['unlimited'][0]:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Check the outbound links in the scrapers' JSON outputs.
+
+Collects every link the scrapers recorded (tool repositories, websites
+and papers, alumni LinkedIn profiles, publication URLs and ORCID iDs)
+and checks each unique URL once. Checks run in a thread pool over one
+keep-alive session, with at most --per-host requests to the same host at
+a time. A link is requested with HEAD, falling back to GET when the
+server refuses HEAD, and redirects are followed. Healthy results are
+cached for --ttl seconds, so a rerun only re-checks what was broken or
+has gone stale.
+
+Prints the broken and redirected links with the records they came from;
+--report also writes them as JSON. Exits with status 1 if any link is
+broken.
+
+    python check_links.py [OUTPUT.json ...] [--workers N] [--per-host N] [--ttl S] [--report FILE]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import fetch
+from incremental import write_json_atomic
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUTS = ('tools_details.json', 'alumni.json', 'publications.json', 'team_details.json')
+# Record fields holding a URL, and how to turn the others into one
+LINK_FIELDS = ('code_repository', 'website', 'publication', 'linkedin', 'url')
+DERIVED_LINKS = {'orcid': 'https://orcid.org/{}'}
+DEFAULT_CACHE = os.path.join(HERE, 'link_cache.json')
+DEFAULT_TTL = 7 * 24 * 3600
+TIMEOUT = (5, 15)  # (connect, read) in seconds
+
+
+def collect_links(paths):
+    """Return URL -> list of "file: record (field)" for every link in the outputs."""
+    links = defaultdict(list)
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f)
+        for entry in entries:
+            label = entry.get('name') or entry.get('title', '')
+            for name, value in entry.items():
+                if not isinstance(value, str) or not value.strip():
+                    continue
+                if name in LINK_FIELDS:
+                    url = value.strip()
+                elif name in DERIVED_LINKS:
+                    url = DERIVED_LINKS[name].format(value.strip())
+                else:
+                    continue
+                links[url].append(f"{os.path.basename(path)}: {label} ({name})")
+    return dict(links)
+
+
+def is_broken(result):
+    return result['error'] is not None or result['status'] >= 400
+
+
+def is_redirected(result):
+    return not is_broken(result) and result['final_url'] != result['url']
+
+
+def load_cache(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def fresh(result, ttl, now):
+    # Only healthy results are trusted; broken links are always re-checked
+    return result is not None and not is_broken(result) and now - result['checked_at'] < ttl
+
+
+def build_session(per_host, user_agent):
+    retry = Retry(
+        total=2,
+        backoff_factor=fetch.BACKOFF_FACTOR,
+        status_forcelist=fetch.RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+    )
+    # One pool per host (up to 100 hosts kept open), per_host connections each
+    adapter = HTTPAdapter(pool_connections=100, pool_maxsize=per_host, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = user_agent
+    return session
+
+
+class LinkChecker:
+    """Check URLs concurrently, at most `per_host` at a time on one host."""
+
+    def __init__(self, workers=16, per_host=2, rate=None, timeout=TIMEOUT, user_agent=fetch.USER_AGENT):
+        self.workers = workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.session = build_session(per_host, user_agent)
+        self.limiter = fetch.RateLimiter(rate) if rate else None
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, host):
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _request(self, method, url):
+        if self.limiter is not None:
+            self.limiter.wait(urlparse(url).hostname or "")
+        # stream=True: a GET fallback only needs the status, not the body
+        response = self.session.request(method, url, allow_redirects=True, stream=True, timeout=self.timeout)
+        response.close()
+        return response
+
+    def check(self, url):
+        """Return the result of checking one URL as a JSON-ready dict."""
+        result = {'url': url, 'status': 0, 'final_url': url, 'redirects': [], 'method': 'HEAD',
+                  'error': None, 'checked_at': time.time()}
+        with self._slot(urlparse(url).hostname or ""):
+            try:
+                response = self._request('HEAD', url)
+                # Plenty of servers answer HEAD with 403, 404 or 405 but serve GET fine
+                if response.status_code >= 400:
+                    result['method'] = 'GET'
+                    response = self._request('GET', url)
+            except requests.exceptions.RequestException as e:
+                result['error'] = f"{type(e).__name__}: {e}"
+                return result
+        result['status'] = response.status_code
+        result['final_url'] = response.url
+        result['redirects'] = [f"{r.status_code} {r.headers.get('Location', '')}" for r in response.history]
+        return result
+
+    def check_all(self, urls):
+        """Check `urls` and return URL -> result.
+
+        The URLs are interleaved by host, so workers are not all stuck
+        waiting on one host's slots while other hosts are idle.
+        """
+        by_host = defaultdict(list)
+        for url in urls:
+            by_host[urlparse(url).hostname or ""].append(url)
+        order = [url for group in zip_longest(*by_host.values()) for url in group if url is not None]
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            return dict(zip(order, executor.map(self.check, order)))
+
+
+def check_links(links, checker, cache_path=DEFAULT_CACHE, ttl=DEFAULT_TTL):
+    """Check the URLs in `links`, reusing fresh healthy results from the cache.
+
+    Returns (URL -> result, number of URLs taken from the cache).
+    """
+    cache = load_cache(cache_path) if cache_path else {}
+    now = time.time()
+    results = {url: cache[url] for url in links if fresh(cache.get(url), ttl, now)}
+    cached = len(results)
+    results.update(checker.check_all([url for url in links if url not in results]))
+    if cache_path:
+        cache.update(results)
+        write_json_atomic(cache_path, cache)
+    return results, cached
+
+
+def build_report(links, results):
+    """Return the broken and redirected links, each with the records citing it."""
+    report = {'checked': len(results), 'broken': [], 'redirected': []}
+    for url in sorted(results):
+        result = results[url]
+        entry = dict(result, sources=links.get(url, []))
+        if is_broken(result):
+            report['broken'].append(entry)
+        elif is_redirected(result):
+            report['redirected'].append(entry)
+    return report
+
+
+def print_report(report):
+    for entry in report['broken']:
+        print(f"BROKEN   {entry['url']}  ({entry['error'] or entry['status']})")
+        for source in entry['sources']:
+            print(f"         {source}")
+    for entry in report['redirected']:
+        print(f"REDIRECT {entry['url']} -> {entry['final_url']}")
+        for source in entry['sources']:
+            print(f"         {source}")
+    print(f"{report['checked']} links checked: {len(report['broken'])} broken, "
+          f"{len(report['redirected'])} redirected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('outputs', nargs='*', help=f"scraper JSON outputs (default: {', '.join(DEFAULT_OUTPUTS)})")
+    parser.add_argument('--workers', type=int, default=16, help="links checked at once")
+    parser.add_argument('--per-host', type=int, default=2, help="links checked at once on the same host")
+    parser.add_argument('--rate', type=float, default=0, help="maximum requests per second per host (0 = no limit)")
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help="file keeping earlier results ('' = no cache)")
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL, help="seconds a healthy result stays valid")
+    parser.add_argument('--report', help="also write the broken and redirected links to this JSON file")
+    parser.add_argument('--user-agent', default=fetch.USER_AGENT, help="User-Agent header sent with every request")
+    args = parser.parse_args()
+
+    paths = args.outputs or [os.path.join(HERE, name) for name in DEFAULT_OUTPUTS if os.path.exists(os.path.join(HERE, name))]
+    links = collect_links(paths)
+    print(f"{len(links)} unique links in {len(paths)} files")
+    checker = LinkChecker(workers=args.workers, per_host=args.per_host, rate=args.rate or None,
+                          user_agent=args.user_agent)
+    start = time.perf_counter()
+    results, cached = check_links(links, checker, args.cache or None, args.ttl)
+    print(f"Checked {len(results) - cached} links in {time.perf_counter() - start:.1f}s ({cached} from cache)\n")
+
+    report = build_report(links, results)
+    print_report(report)
+    if args.report:
+        write_json_atomic(args.report, report)
+    if report['broken']:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Fuzzy deduplication of scraped publication records.
+
+Titles are normalised the way the ORCID loader does it (accents removed,
+lowercased, punctuation dropped, words of three letters or more) and
+compared by Jaccard similarity of their word sets. Candidate pairs come
+from an inverted index over each title's rarest words (prefix filtering),
+which finds every pair above the threshold without comparing all pairs.
+A candidate is merged only if the first authors' names share a word
+("Salovska et al" and "Salovska B, Doe J" do), or, when either record has
+no authors, if the titles are near-identical. Published
+versions are kept over preprints; corrections and errata are never merged
+into the paper they correct.
+
+    python dedup.py publications.json [other.json ...] [--out FILE] [--report FILE]
+"""
+import argparse
+import json
+import math
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+
+from incremental import write_json_atomic
+
+THRESHOLD = 0.8
+STRICT_THRESHOLD = 0.95  # used when authors cannot confirm a match
+PREPRINT_SERVERS = ('biorxiv', 'medrxiv', 'arxiv', 'research square', 'ssrn', 'preprints')
+NON_ALNUM = re.compile(r'[^a-z0-9]+')
+AUTHOR_SEPARATOR = re.compile(r'[,;&]|\band\b', re.IGNORECASE)
+# Corrections and retractions are separate records, not versions of the paper
+NOTICE = re.compile(r'^\W*(author |publisher )?(correction|corrigendum|erratum|retraction|addendum)\b')
+
+
+def normalize(text):
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def words(text):
+    return [word for word in NON_ALNUM.sub(' ', normalize(text)).split() if len(word) > 2]
+
+
+def first_author(authors):
+    # Words of the first name in an author list; initials and "et al" are too short to count
+    return frozenset(words(AUTHOR_SEPARATOR.split(authors, 1)[0]))
+
+
+def is_preprint(record):
+    journal = normalize(record.get('journal', ''))
+    return any(server in journal for server in PREPRINT_SERVERS)
+
+
+def is_notice(record):
+    return bool(NOTICE.match(normalize(record.get('title', ''))))
+
+
+def _prefix_length(size, threshold):
+    # Two sets with Jaccard >= threshold must share a word among each
+    # other's first size - ceil(threshold * size) + 1 rarest words
+    return size - math.ceil(threshold * size - 1e-9) + 1
+
+
+def find_duplicates(records, threshold=THRESHOLD, strict_threshold=STRICT_THRESHOLD):
+    """Return (i, j, similarity, authors_confirmed) for every duplicate pair, i < j."""
+    titles = [frozenset(words(record.get('title', ''))) for record in records]
+    authors = [first_author(record.get('authors', '')) for record in records]
+    notices = [is_notice(record) for record in records]
+    frequency = Counter(word for title in titles for word in title)
+
+    index = defaultdict(list)
+    pairs = []
+    for i, title in enumerate(titles):
+        if not title:
+            continue
+        ordered = sorted(title, key=lambda word: (frequency[word], word))
+        candidates = set()
+        for word in ordered[:_prefix_length(len(ordered), threshold)]:
+            candidates.update(index[word])
+            index[word].append(i)
+        size = len(title)
+        smallest, largest = threshold * size - 1e-9, size / threshold + 1e-9
+        for j in sorted(candidates):
+            other = titles[j]
+            # Size filter: Jaccard can't reach the threshold if sizes differ too much
+            if not smallest <= len(other) <= largest:
+                continue
+            shared = len(title & other)
+            similarity = shared / (size + len(other) - shared)
+            if similarity < threshold or notices[i] != notices[j]:
+                continue
+            if authors[i] and authors[j]:
+                confirmed = bool(authors[i] & authors[j])
+            else:
+                confirmed = None
+            if confirmed or (confirmed is None and similarity >= strict_threshold):
+                pairs.append((j, i, similarity, confirmed))
+    return pairs
+
+
+def deduplicate(records, threshold=THRESHOLD, strict_threshold=STRICT_THRESHOLD):
+    """Return (kept records, merge report).
+
+    Duplicates are grouped transitively; each group keeps its first
+    published (non-preprint) record, or its first record, and fills that
+    record's empty fields from the others.
+    """
+    parent = list(range(len(records)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    pairs = find_duplicates(records, threshold, strict_threshold)
+    for i, j, _, _ in pairs:
+        parent[root(j)] = root(i)
+
+    groups = defaultdict(list)
+    for i in range(len(records)):
+        groups[root(i)].append(i)
+    keeper_of = {}
+    for members in groups.values():
+        keeper = min(members, key=lambda i: (is_preprint(records[i]), i))
+        for i in members:
+            keeper_of[i] = keeper
+
+    kept = []
+    merged = {}
+    for i, record in enumerate(records):
+        if keeper_of[i] == i:
+            merged[i] = dict(record)
+            kept.append(merged[i])
+    for i, record in enumerate(records):
+        keeper = merged[keeper_of[i]]
+        if keeper_of[i] != i:
+            for field, value in record.items():
+                if value and not keeper.get(field):
+                    keeper[field] = value
+
+    similarity_of = {(i, j): (similarity, confirmed) for i, j, similarity, confirmed in pairs}
+    report = []
+    for i in range(len(records)):
+        keeper = keeper_of[i]
+        if keeper == i:
+            continue
+        similarity, confirmed = similarity_of.get((min(i, keeper), max(i, keeper)), (None, None))
+        report.append({
+            'kept': records[keeper].get('title'),
+            'dropped': records[i].get('title'),
+            'dropped_journal': records[i].get('journal'),
+            'similarity': round(similarity, 3) if similarity is not None else None,
+            'authors_confirmed': confirmed,
+        })
+    return kept, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('inputs', nargs='+', help="publication JSON files, e.g. one per ORCID")
+    parser.add_argument('--out', default='publications_deduped.json', help="where to write the merged list")
+    parser.add_argument('--report', default='publications_merges.json', help="where to write the merge report")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help="title Jaccard similarity for a candidate")
+    args = parser.parse_args()
+
+    records = []
+    for path in args.inputs:
+        with open(path, encoding='utf-8') as f:
+            records.extend(json.load(f))
+
+    start = time.perf_counter()
+    kept, report = deduplicate(records, threshold=args.threshold)
+    elapsed = time.perf_counter() - start
+
+    write_json_atomic(args.out, kept)
+    write_json_atomic(args.report, report)
+    print(f"{len(records)} publications -> {len(kept)} after merging {len(report)} duplicates in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
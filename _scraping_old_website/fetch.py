@@ -0,0 +1,310 @@
+import logging
+import os
+import threading
+import time
+from urllib.parse import urldefrag, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import memory
+import tracing
+from http_cache import HttpCache
+
+logger = logging.getLogger("scraper.fetch")
+
+# Defaults for the shared session, override them with configure()
+USER_AGENT = "saezlab-scraper/1.0 (+https://saezlab.org)"
+POOL_SIZE = 10
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) in seconds
+BASE_URL = os.environ.get("SAEZLAB_BASE_URL", "https://saezlab.org")
+MAX_PAGE_BYTES = 16 * 1024 * 1024
+MAX_IMAGE_BYTES = 32 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+_settings = {
+    "user_agent": USER_AGENT,
+    "pool_size": POOL_SIZE,
+    "retries": RETRIES,
+    "backoff_factor": BACKOFF_FACTOR,
+    "timeout": DEFAULT_TIMEOUT,
+    "host_timeouts": {},
+    "rate_limit": None,  # max requests/sec per host, None for no limit
+    "cache": None,  # an http_cache.HttpCache, None to always hit the network
+    "base_url": BASE_URL,
+    "delay_scale": 1.0,  # multiplies the scrapers' politeness pauses, 0 disables them
+    "max_page_bytes": MAX_PAGE_BYTES,  # largest buffered body (pages, sitemaps, API replies), None for no limit
+    "max_image_bytes": MAX_IMAGE_BYTES,  # largest streamed image, None for no limit
+}
+_session = None
+_lock = threading.Lock()
+_shared = {}  # URL -> {"lock", "response"} for get_shared()
+
+
+class BodyTooLarge(requests.exceptions.RequestException):
+    """A response body went over the configured size limit while being read."""
+
+
+class RateLimiter:
+    """Space out requests to the same host to at most `rate` per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        # Reserve the next free slot under the lock, then sleep outside it
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_limiter = None
+
+
+def configure(**settings):
+    """Change session settings; the next request builds a fresh session."""
+    global _session, _limiter
+    unknown = set(settings) - set(_settings)
+    if unknown:
+        raise TypeError(f"Unknown fetch settings: {', '.join(sorted(unknown))}")
+    with _lock:
+        _settings.update(settings)
+        rate = _settings["rate_limit"]
+        _limiter = RateLimiter(rate) if rate else None
+        if _session is not None:
+            _session.close()
+            _session = None
+        _shared.clear()
+
+
+def setup_logging(level=logging.INFO):
+    """Print per-request timings next to the scrapers' own progress output."""
+    logging.basicConfig(level=level, format="%(asctime)s %(name)s %(message)s")
+
+
+def _build_session():
+    retry = Retry(
+        total=_settings["retries"],
+        backoff_factor=_settings["backoff_factor"],
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=_settings["pool_size"],
+        pool_maxsize=_settings["pool_size"],
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = _settings["user_agent"]
+    return session
+
+
+def get_session():
+    """Return the process-wide keep-alive session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def site_url(path=""):
+    """Return an absolute URL on the site being scraped, e.g. site_url("/person/")."""
+    return _settings["base_url"].rstrip("/") + path
+
+
+def pause(seconds):
+    """Politeness pause between requests, scaled by the delay_scale setting."""
+    if seconds * _settings["delay_scale"] > 0:
+        time.sleep(seconds * _settings["delay_scale"])
+
+
+def timeout_for(url):
+    host = urlparse(url).hostname or ""
+    return _settings["host_timeouts"].get(host, _settings["timeout"])
+
+
+def max_bytes(kind):
+    """Body size limit for "page" or "image" responses, or None."""
+    return _settings[f"max_{kind}_bytes"]
+
+
+def check_length(response, limit):
+    """Raise BodyTooLarge if the response announces a body over `limit` bytes."""
+    length = response.headers.get("Content-Length", "")
+    if limit and length.isdigit() and int(length) > limit:
+        response.close()
+        raise BodyTooLarge(f"{response.url} is {length} bytes, over the {limit} byte limit", response=response)
+
+
+def iter_limited(response, limit, chunk_size=CHUNK_SIZE):
+    """Yield the decoded body of a streamed response, raising BodyTooLarge past `limit` bytes.
+
+    With tracing on, reading a network response is recorded as its transfer.
+    """
+    if not tracing.active or getattr(response, "from_cache", False):
+        yield from _limited_chunks(response, limit, chunk_size)
+        return
+    start = time.perf_counter()
+    size = 0
+    try:
+        for chunk in _limited_chunks(response, limit, chunk_size):
+            size += len(chunk)
+            yield chunk
+    finally:
+        tracing.record_transfer(response.url, start, response.status_code, size)
+
+
+def _limited_chunks(response, limit, chunk_size):
+    check_length(response, limit)
+    size = 0
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        size += len(chunk)
+        # Counted after decompression, so a small gzip bomb is caught too
+        if limit and size > limit:
+            response.close()
+            raise BodyTooLarge(f"{response.url} is over the {limit} byte limit", response=response)
+        yield chunk
+
+
+def _read_limited(response, limit):
+    # Buffer a streamed body the way requests would, but stop at the limit
+    # (timed as part of the request, so not through iter_limited's tracing)
+    response._content = b"".join(_limited_chunks(response, limit, CHUNK_SIZE))
+    response._content_consumed = True
+
+
+def _send(url, extra_headers, kwargs):
+    if extra_headers:
+        kwargs = dict(kwargs, headers={**kwargs.get("headers", {}), **extra_headers})
+    if _limiter is not None:
+        _limiter.wait(urlparse(url).hostname or "")
+    # Buffered bodies are streamed in so an oversized one is cut off early;
+    # streaming callers apply their own limit
+    limit = None if kwargs.get("stream") else max_bytes("page")
+    send_kwargs = dict(kwargs, stream=True) if limit else kwargs
+    start = tracing.begin_request() if tracing.active else time.perf_counter()
+    try:
+        response = get_session().get(url, **send_kwargs)
+        if limit:
+            _read_limited(response, limit)
+    except requests.exceptions.RequestException as e:
+        logger.info("GET %s failed after %.3fs: %s", url, time.perf_counter() - start, e)
+        if tracing.active:
+            tracing.end_request(url, start, error=e)
+        raise
+    if kwargs.get("stream"):
+        # Not read yet: iter_limited() records the body's size and transfer
+        length = response.headers.get("Content-Length", "")
+        size, logged_size = None, length if length.isdigit() else "?"
+    else:
+        size = logged_size = len(response.content)
+    if tracing.active:
+        tracing.end_request(url, start, response, size)
+    logger.info(
+        "GET %s -> %s in %.3fs (%s bytes)",
+        url, response.status_code, time.perf_counter() - start, logged_size,
+    )
+    return response
+
+
+def get(url, **kwargs):
+    """GET a URL through the shared session (and cache) and log how long it took."""
+    kwargs.setdefault("timeout", timeout_for(url))
+    cache = _settings["cache"]
+    if cache is None:
+        return _send(url, None, kwargs)
+    # A streamed body goes to the cache file chunk by chunk, under the image limit
+    read_body = (lambda response: iter_limited(response, max_bytes("image"))) if kwargs.get("stream") else None
+    response = cache.fetch(url, lambda extra_headers: _send(url, extra_headers, kwargs), read_body)
+    if getattr(response, "from_cache", False):
+        logger.info("GET %s -> served from cache", url)
+        if tracing.active:
+            tracing.record_cache_hit(url)
+    return response
+
+
+def get_body(url, **kwargs):
+    """GET a page and return its raw bytes and text encoding, for parsing elsewhere.
+
+    Raises for error statuses. The pair can be sent to another process and
+    decoded there with parsing.decode().
+    """
+    response = get(url, **kwargs)
+    response.raise_for_status()
+    return response.content, response.encoding or response.apparent_encoding
+
+
+def get_shared(url, **kwargs):
+    """GET a page several scrapers read, fetching it at most once per process.
+
+    Concurrent callers wait for the first request instead of sending their
+    own. The fragment is ignored, so site_url("/") and site_url("#tools")
+    share one response. Error responses are returned but not kept.
+    """
+    url = urldefrag(url)[0]
+    with _lock:
+        entry = _shared.setdefault(url, {"lock": threading.Lock(), "response": None})
+    with entry["lock"]:
+        if entry["response"] is not None:
+            logger.info("GET %s -> shared with an earlier scraper", url)
+            return entry["response"]
+        response = get(url, **kwargs)
+        if response.ok:
+            entry["response"] = response
+        return response
+
+
+def add_arguments(parser):
+    """Add the shared network/cache options to a scraper's argument parser."""
+    group = parser.add_argument_group("network")
+    group.add_argument("--cache-dir", help="keep an on-disk HTTP cache in this directory")
+    group.add_argument("--cache-size", type=int, default=200, help="cache size budget in MB (default: 200)")
+    group.add_argument("--max-age", type=float, help="treat cached responses as fresh for this many seconds")
+    group.add_argument("--offline", action="store_true", help="serve everything from the cache, never hit the network")
+    group.add_argument("--user-agent", default=USER_AGENT, help="User-Agent header sent with every request")
+    group.add_argument("--base-url", default=BASE_URL, help=f"site to scrape (default: {BASE_URL}, or $SAEZLAB_BASE_URL)")
+    group.add_argument("--no-delay", action="store_true", help="skip the politeness pauses between requests")
+    group.add_argument("--max-page-mb", type=float, default=MAX_PAGE_BYTES / 2**20,
+                       help=f"give up on pages and other buffered responses larger than this (default: {MAX_PAGE_BYTES // 2**20}, 0 = no limit)")
+    group.add_argument("--max-image-mb", type=float, default=MAX_IMAGE_BYTES / 2**20,
+                       help=f"give up on images larger than this (default: {MAX_IMAGE_BYTES // 2**20}, 0 = no limit)")
+    tracing.add_arguments(parser)
+    memory.add_arguments(parser)
+
+
+def configure_from_args(args):
+    """Apply the options added by add_arguments()."""
+    cache = None
+    if args.cache_dir:
+        cache = HttpCache(
+            args.cache_dir,
+            max_bytes=args.cache_size * 1024 * 1024,
+            max_age=args.max_age,
+            offline=args.offline,
+        )
+    elif args.offline:
+        raise SystemExit("--offline needs --cache-dir")
+    tracing.configure_from_args(args)
+    memory.configure_from_args(args)
+    configure(
+        cache=cache,
+        user_agent=args.user_agent,
+        base_url=args.base_url,
+        delay_scale=0.0 if args.no_delay else 1.0,
+        max_page_bytes=int(args.max_page_mb * 2**20) or None,
+        max_image_bytes=int(args.max_image_mb * 2**20) or None,
+    )
@@ -0,0 +1,107 @@
+"""A local HTTP server for running the scrapers against fixtures."""
+import http.server
+import threading
+import time
+
+
+class FixtureServer:
+    """Serve fixed responses on 127.0.0.1 and count what was transferred.
+
+    ``routes`` maps a URL path to a ``(content_type, body)`` pair, where
+    ``body`` is bytes or a str (sent as UTF-8), or a function taking the
+    query string and returning one, for stub APIs. Unknown paths get a 404.
+    Use it as a context manager; ``url`` is the base URL to scrape.
+    ``latency`` (seconds) delays every response, to stand in for a remote
+    server. ``redirects`` maps a path to the location it answers 301 with,
+    and with ``allow_head`` off every HEAD request gets a 405, like
+    servers that only speak GET.
+    """
+
+    def __init__(self, routes, port=0, latency=0.0):
+        self.routes = routes
+        self.latency = latency
+        self.redirects = {}
+        self.allow_head = True
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = http.server.ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self, include_body):
+                path, _, query = self.path.partition('?')
+                route = server.routes.get(path)
+                extra_headers = {}
+                if path in server.redirects:
+                    content_type, body, status = 'text/plain', b'Moved', 301
+                    extra_headers['Location'] = server.redirects[path]
+                elif not include_body and not server.allow_head:
+                    content_type, body, status = 'text/plain', b'Method not allowed', 405
+                elif route is None:
+                    content_type, body, status = 'text/plain', b'Not found', 404
+                else:
+                    content_type, body = route
+                    status = 200
+                    if callable(body):
+                        body = body(query)
+                if server.latency:
+                    time.sleep(server.latency)
+                if isinstance(body, str):
+                    body = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for header, value in extra_headers.items():
+                    self.send_header(header, value)
+                self.end_headers()
+                if include_body:
+                    self.wfile.write(body)
+                server._count(len(body) if include_body else 0)
+
+            def do_GET(self):
+                self._respond(include_body=True)
+
+            def do_HEAD(self):
+                self._respond(include_body=False)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _count(self, size):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += size
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
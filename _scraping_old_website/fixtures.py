@@ -0,0 +1,268 @@
+"""Fixture pages for benchmarking the scrapers without the live site.
+
+Pages are rebuilt from the JSON the scrapers recorded in this directory
+(alumni.json, tools_details.json, team_details.json, publications.json)
+using the markup the scrapers expect from saezlab.org. Saved copies of
+real pages can be used instead by pointing load_pages() at a directory
+laid out like the site (``index.html``, ``person/<slug>/index.html``,
+``publication/page/<n>/index.html``, ``sitemap.xml``). synthetic_data() scales the
+recorded data up for load testing, and build_routes() adds the images from
+public/ so the pages can be served by fixture_server.FixtureServer.
+europepmc_stub() stands in for the Europe PMC search used by identifiers.py.
+"""
+import copy
+import json
+import mimetypes
+import os
+import re
+from html import escape
+from urllib.parse import parse_qs
+
+from dedup import words
+from slugs import slugify
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PUBLIC_DIR = os.path.join(HERE, '..', 'public')
+PER_PAGE = 10
+
+# Where fixture pages point their images, and where the files live locally
+IMAGE_DIRS = {
+    '/images/team/': os.path.join(PUBLIC_DIR, 'team_images'),
+    '/images/tools/': os.path.join(PUBLIC_DIR, 'software_images'),
+}
+
+
+def load_recorded():
+    """Return the recorded scraper outputs keyed by scraper name."""
+    data = {}
+    for key, filename in (('alumni', 'alumni.json'), ('tools', 'tools_details.json'),
+                          ('team', 'team_details.json'), ('publications', 'publications.json')):
+        with open(os.path.join(HERE, filename), encoding='utf-8') as f:
+            data[key] = json.load(f)
+    return data
+
+
+def _scaled(records, count, key):
+    # Repeat the recorded records, making `key` unique on every extra copy
+    scaled = []
+    for i in range(count):
+        record = copy.deepcopy(records[i % len(records)])
+        if i >= len(records):
+            record[key] = f"{record[key]} {i // len(records) + 1}"
+        scaled.append(record)
+    return scaled
+
+
+def synthetic_data(people, publications, data=None, tools=None):
+    """Scale the recorded data up to `people` team members and `publications` entries.
+
+    With `tools`, the homepage lists that many resources too.
+    """
+    data = copy.deepcopy(data or load_recorded())
+    data['team'] = _scaled(data['team'], people, 'name')
+    data['publications'] = _scaled(data['publications'], publications, 'title')
+    if tools is not None:
+        data['tools'] = _scaled(data['tools'], tools, 'name')
+    return data
+
+
+def _table(rows):
+    cells = ''.join(
+        '<tr>' + ''.join(f'<td>{escape(value)}</td>' for value in row) + '</tr>'
+        for row in rows
+    )
+    return f'<table class="table">{cells}</table>'
+
+
+def render_homepage(alumni, tools):
+    resources = []
+    for tool in tools:
+        categories = [name for name in ('tool', 'database') if tool['categories'][name]]
+        icon = f'<img class="icon" src="/images/tools/{escape(tool["image"])}">' if tool['image'] else ''
+        links = ''.join(
+            f'<td><a href="{escape(tool[key])}">link</a></td>' if tool[key] else '<td></td>'
+            for key in ('code_repository', 'website', 'publication')
+        )
+        resources.append(
+            f'<div class="resource col-md-4">{icon}<h3>{escape(tool["name"])}</h3>'
+            f'<p>{escape(tool["short_description"])}</p>'
+            f'<div class="hidden"><p>{escape(tool["long_description"])}</p>'
+            f'<!-- array({", ".join(repr(c) for c in categories)}) -->'
+            f'<table><tr><th>Code</th><th>Website</th><th>Publication</th></tr><tr>{links}</tr></table>'
+            f'</div></div>'
+        )
+    alumni_rows = ''.join(
+        f'<tr><td><a href="{escape(person["linkedin"])}">{escape(person["name"])}</a></td>'
+        f'<td>{escape(person["duration"])}</td><td>{escape(person["position"])}</td></tr>'
+        for person in alumni
+    )
+    return (
+        '<html><head><title>Saez Lab</title></head><body>'
+        '<nav><a href="/">Home</a><a href="/publication/">Publications</a></nav>'
+        f'<section id="tools"><div class="row">{"".join(resources)}</div></section>'
+        '<div id="t-alumni"><table class="table">'
+        f'<tr><th>Name</th><th>Period</th><th>Position</th></tr>{alumni_rows}</table></div>'
+        '<footer>Saez Lab</footer></body></html>'
+    )
+
+
+def render_person_page(person):
+    image = f'<img class="img-responsive" src="/images/team/{escape(person["image"])}">' if person['image'] else ''
+    sections = ''
+    if person['research_interests']:
+        sections += f'<h3>Research Interests</h3><p>{escape(person["research_interests"])}</p>'
+    if person['professional_career']:
+        rows = [(item['period'], item['position']) for item in person['professional_career']]
+        sections += f'<h3>Professional Career</h3>{_table(rows)}'
+    if person['education']:
+        rows = [(item['period'], item['degree']) for item in person['education']]
+        sections += f'<h3>Education</h3>{_table(rows)}'
+    contact = ''
+    if person['telephone']:
+        contact += f'<a href="tel:{escape(person["telephone"])}">Direct: {escape(person["telephone"])}</a>'
+    if person['orcid']:
+        contact += f'<a href="https://orcid.org/{escape(person["orcid"])}">{escape(person["orcid"])}</a>'
+    if person['email']:
+        contact += f'<span class="imMail">{escape(person["email"])}</span>'
+    return (
+        f'<html><head><title>{escape(person["name"])}</title></head><body>'
+        '<nav><a href="/">Home</a><a href="/publication/">Publications</a></nav>'
+        f'<div class="person">{image}<div class="desc">{escape(person["description"])}</div>'
+        f'{sections}<div class="contact">{contact}</div></div>'
+        '<footer>Saez Lab</footer></body></html>'
+    )
+
+
+def publication_page_path(page):
+    return '/publication/' if page == 1 else f'/publication/page/{page}/'
+
+
+def publication_page_number(path):
+    return int(path.rstrip('/').rsplit('/', 1)[1]) if '/page/' in path else 1
+
+
+def render_publication_pages(publications, base_url, per_page=PER_PAGE):
+    """Return the listing pages, each linking to the next as the live site does."""
+    pages = []
+    chunks = [publications[i:i + per_page] for i in range(0, len(publications), per_page)] or [[]]
+    for number, chunk in enumerate(chunks, start=1):
+        entries = ''.join(
+            f'<div class="publication"><a href="{escape(pub["url"])}">{escape(pub["title"])}</a>'
+            f'<p class="para bib-ref">{escape(pub["authors"])}. {escape(pub["journal"])}, {escape(pub["year"])}</p></div>'
+            for pub in chunk
+        )
+        pagination = ''.join(
+            f'<a class="page-numbers" href="{base_url}{publication_page_path(n)}">{n}</a>'
+            for n in range(1, len(chunks) + 1) if n != number
+        )
+        if number < len(chunks):
+            pagination += f'<a class="next page-numbers" href="{base_url}{publication_page_path(number + 1)}">Next</a>'
+        pages.append(
+            '<html><head><title>Publications</title></head><body>'
+            f'<div class="publications">{entries}</div><nav class="pagination">{pagination}</nav>'
+            '</body></html>'
+        )
+    return pages
+
+
+def europepmc_results(publications):
+    """Return the search results a Europe PMC stub serves for the recorded publications.
+
+    Each publication gets a PMID (its own, if its URL has one), a PMCID and
+    a DOI, plus a decoy with the same title by other authors.
+    """
+    results = []
+    for number, pub in enumerate(publications):
+        match = re.search(r'/MED/(\d+)', pub['url'])
+        pmid = match.group(1) if match else str(90000000 + number)
+        surname = pub['authors'].replace(' et al', '').strip()
+        common = {'title': pub['title'], 'journalTitle': pub['journal'], 'pubYear': pub['year'], 'source': 'MED'}
+        results.append(dict(common, id=pmid, pmid=pmid, pmcid=f'PMC{pmid}', doi=f'10.5555/{pmid}',
+                            authorString=f'{surname} A, Doe J, Roe R.'))
+        results.append(dict(common, id=f'9{pmid}', pmid=f'9{pmid}', doi=f'10.5555/9{pmid}',
+                            authorString='Nobody N, Else E.'))
+    return results
+
+
+def europepmc_stub(publications):
+    """Return a FixtureServer route body answering Europe PMC style searches.
+
+    Understands queries ORing ``EXT_ID:<pmid>`` and ``TITLE:"<title>"``
+    terms; a title term matches results sharing most of its words.
+    """
+    results = europepmc_results(publications)
+
+    def search(query_string):
+        params = parse_qs(query_string)
+        query = params.get('query', [''])[0]
+        size = int(params.get('pageSize', ['25'])[0])
+        pmids = set(re.findall(r'EXT_ID:(\d+)', query))
+        titles = [set(words(title)) for title in re.findall(r'TITLE:"([^"]*)"', query)]
+        found = [
+            result for result in results
+            if result['pmid'] in pmids or any(
+                len(title & set(words(result['title']))) >= 0.7 * len(title) for title in titles if title)
+        ]
+        return json.dumps({'hitCount': len(found), 'resultList': {'result': found[:size]}})
+
+    return search
+
+
+def render_sitemap(paths, base_url):
+    urls = ''.join(f'<url><loc>{escape(base_url + path)}</loc></url>' for path in paths)
+    return ('<?xml version="1.0" encoding="UTF-8"?>'
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>')
+
+
+def build_pages(data=None, base_url='https://saezlab.org'):
+    """Return a dict of site path -> HTML (or sitemap XML) for every page the scrapers visit."""
+    data = data or load_recorded()
+    pages = {'/': render_homepage(data['alumni'], data['tools'])}
+    for person in data['team']:
+        pages[f'/person/{slugify(person["name"])}/'] = render_person_page(person)
+    for number, html in enumerate(render_publication_pages(data['publications'], base_url), start=1):
+        pages[publication_page_path(number)] = html
+    pages['/sitemap.xml'] = render_sitemap(list(pages), base_url)
+    return pages
+
+
+def build_routes(pages):
+    """Turn pages into FixtureServer routes, adding the images they reference."""
+    routes = {
+        path: ('application/xml' if path.endswith('.xml') else 'text/html; charset=utf-8', html)
+        for path, html in pages.items()
+    }
+    for prefix, directory in IMAGE_DIRS.items():
+        if not os.path.isdir(directory):
+            continue
+        for filename in os.listdir(directory):
+            with open(os.path.join(directory, filename), 'rb') as f:
+                content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                routes[prefix + filename] = (content_type, f.read())
+    return routes
+
+
+def save_pages(directory, pages):
+    for path, html in pages.items():
+        # Pages are saved as <path>/index.html, files like sitemap.xml as themselves
+        target = os.path.join(directory, path.strip('/'), '' if path.endswith('.xml') else 'index.html')
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'w', encoding='utf-8') as f:
+            f.write(html)
+
+
+def load_pages(directory):
+    """Read pages saved with save_pages() or recorded from the live site."""
+    pages = {}
+    for root, _, files in os.walk(directory):
+        relative = os.path.relpath(root, directory).replace(os.sep, '/')
+        if 'index.html' in files:
+            path = '/' if relative == '.' else f'/{relative}/'
+            with open(os.path.join(root, 'index.html'), encoding='utf-8') as f:
+                pages[path] = f.read()
+        for filename in files:
+            if filename.endswith('.xml'):
+                path = f'/{filename}' if relative == '.' else f'/{relative}/{filename}'
+                with open(os.path.join(root, filename), encoding='utf-8') as f:
+                    pages[path] = f.read()
+    return pages
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Response headers worth keeping for revalidation and for rebuilding a Response
+STORED_HEADERS = ('Content-Type', 'Content-Length', 'ETag', 'Last-Modified', 'Cache-Control', 'Date')
+# Headers a 304 may legitimately update on the stored entry
+REVALIDATION_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control', 'Date')
+
+
+class OfflineCacheMiss(requests.exceptions.ConnectionError):
+    """Raised in offline mode when a URL is not in the cache."""
+
+
+class HttpCache:
+    """On-disk response cache keyed by URL with conditional revalidation.
+
+    Every entry is a body file plus a small JSON metadata file. Entries are
+    served without a request while fresh (``max_age`` override, else the
+    stored ``Cache-Control: max-age``), revalidated with
+    ``If-None-Match``/``If-Modified-Since`` otherwise, and evicted least
+    recently used first once the cache grows past ``max_bytes``. In
+    ``offline`` mode the network is never touched.
+    """
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, max_age=None, offline=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.offline = offline
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._index = self._load_index()
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.body'
+
+    def _load_index(self):
+        # url -> (size, last_used), rebuilt from the metadata files
+        index = {}
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            index[meta['url']] = (meta['size'], meta['last_used'])
+        return index
+
+    def _read_meta(self, url):
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, url, meta):
+        meta_path, _ = self._paths(url)
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+        with self._lock:
+            self._index[url] = (meta['size'], meta['last_used'])
+
+    def _is_fresh(self, meta):
+        age = time.time() - meta['stored_at']
+        if self.max_age is not None:
+            return age < self.max_age
+        cache_control = meta['headers'].get('Cache-Control', '').lower()
+        if 'no-cache' in cache_control:
+            return False
+        match = re.search(r'max-age=(\d+)', cache_control)
+        return bool(match) and age < int(match.group(1))
+
+    def _response(self, url, meta, stream=False, body_file=None):
+        """Rebuild a cached response, or return None if its body has gone.
+
+        `body_file` is the body already opened, as _store() returns it.
+        """
+        _, body_path = self._paths(url)
+        try:
+            body_file = body_file or open(body_path, 'rb')
+            if not stream:
+                with body_file:
+                    body = body_file.read()
+        except OSError:
+            # Evicted by another thread (or deleted by hand) since the metadata was read
+            self._drop(url)
+            return None
+        meta['last_used'] = time.time()
+        self._write_meta(url, meta)
+
+        response = requests.Response()
+        response.status_code = meta['status']
+        response.url = url
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        if stream:
+            # Read back in chunks by iter_content(), like a streamed network response
+            response.raw = body_file
+        else:
+            response._content = body
+            response._content_consumed = True
+        response.from_cache = True
+        return response
+
+    def _store(self, url, response, read_body=None):
+        """Write a 200 response to the cache; return (metadata, open body file or None), or None.
+
+        With `read_body` the body is streamed to disk and returned opened,
+        so the caller can read it even if it is evicted at once.
+        """
+        headers = {h: response.headers[h] for h in STORED_HEADERS if h in response.headers}
+        if 'no-store' in headers.get('Cache-Control', '').lower():
+            return None
+        _, body_path = self._paths(url)
+        tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in read_body(response) if read_body else (response.content,):
+                    f.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            # Over the caller's size limit or cut off: keep nothing
+            os.remove(tmp_path)
+            raise
+        body_file = open(tmp_path, 'rb') if read_body else None
+        os.replace(tmp_path, body_path)
+        now = time.time()
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'headers': headers,
+            'size': size,
+            'stored_at': now,
+            'last_used': now,
+        }
+        self._write_meta(url, meta)
+        return meta, body_file
+
+    def _evict(self, keep=None):
+        # `keep` is the entry being returned: it stays, even over budget,
+        # until the next store
+        with self._lock:
+            total = sum(size for size, _ in self._index.values())
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for url, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+                if total <= self.max_bytes:
+                    break
+                if url == keep:
+                    continue
+                victims.append(url)
+                total -= size
+            for url in victims:
+                del self._index[url]
+        for url in victims:
+            self._remove_files(url)
+
+    def _remove_files(self, url):
+        for path in self._paths(url):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _drop(self, url):
+        with self._lock:
+            self._index.pop(url, None)
+        self._remove_files(url)
+
+    def fetch(self, url, send, read_body=None):
+        """Return a response for `url`, calling `send(extra_headers)` only when needed.
+
+        For a streamed request, `read_body(response)` yields the body in
+        chunks (applying any size limit); the body is stored chunk by chunk
+        and the returned response reads it back from the cache file.
+        """
+        stream = read_body is not None
+        meta = self._read_meta(url)
+        if meta is not None and (self.offline or self._is_fresh(meta)):
+            response = self._response(url, meta, stream)
+            if response is not None:
+                return response
+            meta = None  # the body has gone: a miss after all
+        if self.offline:
+            raise OfflineCacheMiss(f"{url} is not in the cache")
+
+        conditional = {}
+        if meta is not None:
+            if 'ETag' in meta['headers']:
+                conditional['If-None-Match'] = meta['headers']['ETag']
+            if 'Last-Modified' in meta['headers']:
+                conditional['If-Modified-Since'] = meta['headers']['Last-Modified']
+
+        response = send(conditional)
+        if response.status_code == 304 and meta is not None:
+            # Unchanged: restart the freshness clock and pick up new validators
+            meta['headers'].update({h: response.headers[h] for h in REVALIDATION_HEADERS if h in response.headers})
+            meta['stored_at'] = time.time()
+            cached = self._response(url, meta, stream)
+            if cached is not None:
+                return cached
+            # The body went while the request was out: ask for it in full
+            response = send({})
+        if response.status_code == 200:
+            stored = self._store(url, response, read_body)
+            if stored is not None:
+                stored_meta, body_file = stored
+                if stream:
+                    response = self._response(url, stored_meta, stream=True, body_file=body_file)
+                    response.from_cache = False  # read back from disk, but just downloaded
+                self._evict(keep=url)
+        return response
@@ -0,0 +1,218 @@
+"""Fill in PMIDs, PMCIDs and DOIs for scraped publication records.
+
+Publications are looked up in batches on a Europe PMC style search
+endpoint: one query ORs together the titles of --batch-size publications
+(or their PubMed IDs, when the URL already is a Europe PMC MED link), and
+--lookup-concurrency batches are in flight at once, paced by the fetch
+rate limit. Every publication in the batch is scored against every result:
+title word overlap (Jaccard, words normalised as in dedup), weighted 3:1
+with the share of its author surnames found among the candidate's
+authors. The best candidate at or above --min-score wins.
+
+Identifiers go into the records' pmid, pmcid and doi fields, named as in
+the site's PMC loader (src/content/loaders/pmc.ts). Every lookup, found
+or not, is cached on disk by normalised title, so a rerun sends nothing
+for publications it has seen.
+
+    python identifiers.py publications.json [--out FILE] [--endpoint URL] [--batch-size N] [--lookup-concurrency N]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from urllib.parse import urlencode
+
+import dedup
+import fetch
+from incremental import write_json_atomic
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ENDPOINT = os.environ.get("EUROPEPMC_SEARCH_URL", "https://www.ebi.ac.uk/europepmc/webservices/rest/search")
+DEFAULT_CACHE = os.path.join(HERE, 'publication_ids.json')
+BATCH_SIZE = 20
+CANDIDATES_PER_TITLE = 3  # results asked for per title in a batch
+MIN_SCORE = 0.8
+TITLE_WEIGHT = 0.75  # the rest of the score is author overlap
+MAX_PAGE_SIZE = 1000  # the most results Europe PMC returns per request
+FIELDS = ('pmid', 'pmcid', 'doi')
+MED_URL = re.compile(r'europepmc\.org/abstract/MED/(\d+)')
+QUERY_UNSAFE = re.compile(r'["\\:()\[\]{}]+')
+
+
+def cache_key(publication):
+    return ' '.join(dedup.words(publication['title']))
+
+
+def known_pmid(publication):
+    # Most listing entries link their Europe PMC abstract, which is keyed by PMID
+    match = MED_URL.search(publication.get('url', ''))
+    return match.group(1) if match else None
+
+
+def query_term(publication):
+    pmid = known_pmid(publication)
+    if pmid:
+        return f'(EXT_ID:{pmid} AND SRC:MED)'
+    title = ' '.join(QUERY_UNSAFE.sub(' ', publication['title']).split())
+    return f'TITLE:"{title}"'
+
+
+def search(query, page_size, endpoint=ENDPOINT):
+    """Return the results of one search request."""
+    params = {'query': query, 'format': 'json', 'resultType': 'lite', 'pageSize': min(page_size, MAX_PAGE_SIZE)}
+    # The query goes in the URL itself so fetch's cache can key on it
+    response = fetch.get(f"{endpoint}?{urlencode(params)}")
+    response.raise_for_status()
+    return response.json().get('resultList', {}).get('result', [])
+
+
+def score(publication, candidate):
+    """Return how well a search result matches a publication, from 0 to 1."""
+    title = set(dedup.words(publication['title']))
+    found = set(dedup.words(candidate.get('title', '')))
+    if not title or not found:
+        return 0.0
+    similarity = len(title & found) / len(title | found)
+    # Surnames only: dedup.words drops initials and "et al"
+    authors = set(dedup.words(publication.get('authors', '')))
+    if not authors:
+        return similarity
+    overlap = len(authors & set(dedup.words(candidate.get('authorString', '')))) / len(authors)
+    return TITLE_WEIGHT * similarity + (1 - TITLE_WEIGHT) * overlap
+
+
+def best_match(publication, results, min_score=MIN_SCORE):
+    """Return (identifiers, score) for the best result, or ({}, best score) if none is good enough."""
+    pmid = known_pmid(publication)
+    best, best_score = None, 0.0
+    for candidate in results:
+        if pmid and candidate.get('pmid') == pmid:
+            best, best_score = candidate, 1.0
+            break
+        candidate_score = score(publication, candidate)
+        if candidate_score > best_score:
+            best, best_score = candidate, candidate_score
+    if best is None or best_score < min_score:
+        return {}, round(best_score, 3)
+    return {name: best[name] for name in FIELDS if best.get(name)}, round(best_score, 3)
+
+
+def resolve_batch(publications, endpoint=ENDPOINT, min_score=MIN_SCORE):
+    """Look up a batch of publications with one search; returns a cache entry per publication."""
+    query = ' OR '.join(query_term(publication) for publication in publications)
+    results = search(query, len(publications) * CANDIDATES_PER_TITLE, endpoint)
+    entries = []
+    for publication in publications:
+        found, match_score = best_match(publication, results, min_score)
+        entries.append({'identifiers': found, 'score': match_score, 'checked_at': time.time()})
+    return entries
+
+
+async def resolve_all(batches, concurrency, endpoint=ENDPOINT, min_score=MIN_SCORE):
+    """Resolve the batches with at most `concurrency` requests in flight, in batch order."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def resolve(batch):
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(resolve_batch, batch, endpoint, min_score)
+            except Exception as e:
+                # A failed batch is retried next run instead of being cached as a miss
+                print(f"Lookup of {len(batch)} publications failed: {e}")
+                return None
+
+    return await asyncio.gather(*(resolve(batch) for batch in batches))
+
+
+def load_cache(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def enrich(publications, endpoint=ENDPOINT, batch_size=BATCH_SIZE, concurrency=4, min_score=MIN_SCORE,
+           cache_path=DEFAULT_CACHE, refresh=False):
+    """Set pmid, pmcid and doi on publication dicts in place; returns (found, looked up)."""
+    cache = load_cache(cache_path) if cache_path and not refresh else {}
+    todo = {}
+    for publication in publications:
+        key = cache_key(publication)
+        if key and key not in cache:
+            todo.setdefault(key, publication)
+
+    if todo:
+        pending = list(todo.items())
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        print(f"Looking up {len(pending)} publications in {len(batches)} batches...")
+        results = asyncio.run(resolve_all([[publication for _, publication in batch] for batch in batches],
+                                          concurrency, endpoint, min_score))
+        for batch, entries in zip(batches, results):
+            if entries is not None:
+                cache.update((key, entry) for (key, _), entry in zip(batch, entries))
+        if cache_path:
+            write_json_atomic(cache_path, cache)
+
+    found = 0
+    for publication in publications:
+        identifiers = cache.get(cache_key(publication), {}).get('identifiers', {})
+        for name in FIELDS:
+            # Keep identifiers set by hand over looked-up ones
+            if identifiers.get(name) and not publication.get(name):
+                publication[name] = identifiers[name]
+        found += bool(identifiers)
+    return found, len(todo)
+
+
+def enrich_file(path, out_path=None, **options):
+    """Add identifiers to the publications JSON at `path`, writing it to `out_path` (default: in place)."""
+    with open(path, encoding='utf-8') as f:
+        publications = json.load(f)
+    found, looked_up = enrich(publications, **options)
+    write_json_atomic(out_path or path, publications, ensure_ascii=True)
+    print(f"Identifiers for {found} of {len(publications)} publications ({looked_up} looked up, "
+          f"the rest from the cache)")
+    return found
+
+
+def add_arguments(parser):
+    group = parser.add_argument_group("identifier lookup")
+    group.add_argument('--endpoint', default=ENDPOINT, help=f"Europe PMC style search URL (default: {ENDPOINT}, or $EUROPEPMC_SEARCH_URL)")
+    group.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="publications looked up per request")
+    group.add_argument('--lookup-concurrency', type=int, default=4, help="lookup requests in flight at once")
+    group.add_argument('--min-score', type=float, default=MIN_SCORE, help="lowest title/author score accepted as a match")
+    group.add_argument('--id-cache', default=DEFAULT_CACHE, help="file caching earlier lookups ('' = no cache)")
+    group.add_argument('--refresh-ids', action='store_true', help="ignore cached lookups and ask again")
+
+
+def options_from_args(args):
+    """Keyword arguments for enrich() from the options added by add_arguments()."""
+    return {
+        'endpoint': args.endpoint,
+        'batch_size': args.batch_size,
+        'concurrency': args.lookup_concurrency,
+        'min_score': args.min_score,
+        'cache_path': args.id_cache or None,
+        'refresh': args.refresh_ids,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help="publications JSON written by scrape_publications.py")
+    parser.add_argument('--out', help="write the enriched records here instead of in place")
+    parser.add_argument('--rate', type=float, default=5.0, help="maximum lookup requests per second (0 = no limit)")
+    add_arguments(parser)
+    fetch.add_arguments(parser)
+    args = parser.parse_args()
+    fetch.setup_logging()
+    fetch.configure_from_args(args)
+    fetch.configure(rate_limit=args.rate or None, pool_size=max(args.lookup_concurrency, 1))
+    enrich_file(args.path, args.out, **options_from_args(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Resized WebP (and optionally AVIF) variants of the scraped images.
+
+For every image in a directory this writes ``<stem>-<width>w.webp`` files
+for each width in SIZES (never upscaling), with EXIF stripped, and a
+``variants.json`` manifest mapping each source filename to its hash,
+dimensions and variants. Sources whose hash matches the manifest are
+skipped. Work is spread over a process pool.
+
+    python image_variants.py team_images [--out DIR] [--avif] [--workers N]
+
+Needs Pillow (``pip install Pillow``); AVIF needs a Pillow build with AVIF
+support.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from incremental import write_json_atomic
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+SIZES = (160, 320, 640)
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+QUALITY = {'webp': 80, 'avif': 60}
+MANIFEST = 'variants.json'
+
+
+def avif_supported():
+    return Image is not None and '.avif' in Image.registered_extensions()
+
+
+def file_hash(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def make_variants(source_path, out_dir, formats, sizes=SIZES):
+    """Write the variants of one image; runs in a worker process."""
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    with Image.open(source_path) as image:
+        # Apply the EXIF rotation, then drop all metadata by not passing it on
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            has_alpha = 'transparency' in image.info or image.mode in ('LA', 'PA')
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+        width, height = image.size
+        widths = sorted({min(size, width) for size in sizes})
+        variants = []
+        for target_width in widths:
+            target_height = max(1, round(height * target_width / width))
+            resized = image if target_width == width else image.resize((target_width, target_height), Image.LANCZOS)
+            for fmt in formats:
+                filename = f"{stem}-{target_width}w.{fmt}"
+                resized.save(os.path.join(out_dir, filename), fmt.upper(), quality=QUALITY[fmt])
+                variants.append({'file': filename, 'format': fmt, 'width': target_width, 'height': target_height})
+    return {'width': width, 'height': height, 'variants': variants}
+
+
+def build_variants(image_dir, out_dir=None, avif=False, workers=None):
+    """Bring the variants of every image in `image_dir` up to date; returns the manifest."""
+    if Image is None:
+        raise RuntimeError("Building image variants needs Pillow: pip install Pillow")
+    if avif and not avif_supported():
+        raise RuntimeError("This Pillow build cannot write AVIF")
+    out_dir = out_dir or os.path.join(image_dir, 'variants')
+    os.makedirs(out_dir, exist_ok=True)
+    formats = ('webp', 'avif') if avif else ('webp',)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+
+    manifest = {}
+    pending = {}
+    reused = 0
+    for filename in sorted(os.listdir(image_dir)):
+        path = os.path.join(image_dir, filename)
+        if not filename.lower().endswith(SOURCE_EXTENSIONS) or not os.path.isfile(path):
+            continue
+        digest = file_hash(path)
+        entry = previous.get(filename)
+        if entry and entry['sha256'] == digest and entry['formats'] == list(formats):
+            manifest[filename] = entry
+            reused += 1
+        else:
+            pending[filename] = digest
+
+    # Spawned, not forked: scrape_all calls this while other scrapers' fetch threads run
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {
+            filename: executor.submit(make_variants, os.path.join(image_dir, filename), out_dir, formats)
+            for filename in pending
+        }
+        for filename, future in futures.items():
+            try:
+                manifest[filename] = {'sha256': pending[filename], 'formats': list(formats), **future.result()}
+            except Exception as e:
+                print(f"Error building variants for {filename}: {e}")
+
+    write_json_atomic(manifest_path, dict(sorted(manifest.items())))
+    print(f"Image variants: {len(manifest) - reused} rebuilt, {reused} unchanged")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('image_dir', help="directory with the downloaded images")
+    parser.add_argument('--out', help="where to write the variants (default: <image_dir>/variants)")
+    parser.add_argument('--avif', action='store_true', help="also write AVIF variants")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per core)")
+    args = parser.parse_args()
+    build_variants(args.image_dir, args.out, avif=args.avif, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
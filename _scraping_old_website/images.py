@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import fetch
+from incremental import write_json_atomic
+
+CHUNK_SIZE = 64 * 1024
+# Images up to this size are hashed in memory before anything touches the disk
+SPOOL_SIZE = 1024 * 1024
+STORE_DIR = '.image_store'
+
+
+def store_path(directory):
+    """Where the blobs and manifest of image `directory` live: <parent>/.image_store/<name>."""
+    parent, name = os.path.split(os.path.normpath(directory))
+    return os.path.join(parent, STORE_DIR, name)
+
+
+class ImageStore:
+    """Content-addressed image directory shared by the scrapers.
+
+    Each distinct image is stored once as ``blobs/<sha256><ext>``; the
+    per-person or per-tool filename the scrapers report is a hard link to
+    its blob. ``manifest.json`` records the URL, hash, size and type behind
+    every filename. Both live in a hidden sibling (see store_path()), so
+    the image directory holds only the named files and can be copied into
+    public/ as is. An image whose hash is already linked under its name is
+    not written again.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        store_dir = store_path(directory)
+        self.blob_dir = os.path.join(store_dir, 'blobs')
+        self.manifest_path = os.path.join(store_dir, 'manifest.json')
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(directory, exist_ok=True)
+        self._move_old_store()
+        self._lock = threading.Lock()
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def _move_old_store(self):
+        # Stores used to live inside the image directory itself
+        for name, target in (('blobs', self.blob_dir), ('manifest.json', self.manifest_path)):
+            old = os.path.join(self.directory, name)
+            if not os.path.exists(old):
+                continue
+            if name == 'blobs':
+                for filename in os.listdir(old):
+                    os.replace(os.path.join(old, filename), os.path.join(target, filename))
+                os.rmdir(old)
+            elif not os.path.exists(target):
+                os.replace(old, target)
+            else:
+                os.remove(old)
+
+    def _download(self, url, spool):
+        """Stream `url` into `spool`, returning (sha256, size, content type)."""
+        response = fetch.get(url, stream=True)
+        response.raise_for_status()
+        content_type = response.headers.get('Content-Type', '')
+        if content_type and not content_type.startswith('image/'):
+            raise ValueError(f"{url} is not an image ({content_type})")
+        hasher = hashlib.sha256()
+        size = 0
+        # Stops with fetch.BodyTooLarge once the image passes --max-image-mb
+        for chunk in fetch.iter_limited(response, fetch.max_bytes("image"), CHUNK_SIZE):
+            hasher.update(chunk)
+            spool.write(chunk)
+            size += len(chunk)
+        expected = response.headers.get('Content-Length')
+        if expected and 'Content-Encoding' not in response.headers and int(expected) != size:
+            raise ValueError(f"{url} was truncated ({size} of {expected} bytes)")
+        return hasher.hexdigest(), size, content_type
+
+    def _link(self, filename, blob_path):
+        path = os.path.join(self.directory, filename)
+        if os.path.exists(path) and os.path.samefile(path, blob_path):
+            return
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.link(blob_path, tmp_path)
+        except OSError:
+            shutil.copyfile(blob_path, tmp_path)
+        os.replace(tmp_path, path)
+
+    def save(self, url, filename):
+        """Download `url` and store it as `filename`; returns `filename`."""
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE, dir=self.blob_dir) as spool:
+            digest, size, content_type = self._download(url, spool)
+            blob_path = os.path.join(self.blob_dir, digest + os.path.splitext(filename)[1])
+            # Write the blob only if these bytes were never stored before
+            if not os.path.exists(blob_path):
+                spool.seek(0)
+                tmp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    shutil.copyfileobj(spool, f)
+                os.replace(tmp_path, blob_path)
+        self._link(filename, blob_path)
+
+        entry = {'url': url, 'sha256': digest, 'size': size, 'content_type': content_type}
+        with self._lock:
+            if self.manifest.get(filename) != entry:
+                self.manifest[filename] = entry
+                write_json_atomic(self.manifest_path, self.manifest)
+        return filename
+
+    def save_many(self, items, workers=4):
+        """Download (url, filename) pairs in parallel.
+
+        Returns a list with the filename, or None for a failed download,
+        in the order of `items`.
+        """
+        def save_one(item):
+            url, filename = item
+            try:
+                return self.save(url, filename)
+            except Exception as e:
+                print(f"Error downloading image {filename}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(save_one, items))
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(directory):
+    """Return the shared ImageStore for `directory`."""
+    key = os.path.abspath(directory)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ImageStore(directory)
+        return _stores[key]
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import threading
+
+
+def fingerprint(content):
+    """Return a stable fingerprint for a page body or an HTML block."""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+def write_json_atomic(path, data, ensure_ascii=False):
+    # Write next to the target and rename, so a crash never leaves half a file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=ensure_ascii)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def fingerprints_path(output_path):
+    root, _ = os.path.splitext(output_path)
+    return f"{root}.fingerprints.json"
+
+
+class IncrementalState:
+    """Previous scraper output plus the fingerprints it was built from.
+
+    The fingerprints live in a sidecar file next to the output
+    (``team_details.fingerprints.json`` for ``team_details.json``) mapping
+    each source fingerprint to the name of the record parsed from it, so the
+    output JSON keeps exactly the shape the rest of the site expects.
+    """
+
+    def __init__(self, output_path, enabled=True):
+        self.output_path = output_path
+        self.enabled = enabled
+        self.previous = {}
+        self.previous_fingerprints = {}
+        self.fingerprints = {}
+        self.reused = 0
+        self._lock = threading.Lock()
+        if enabled:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.output_path, encoding='utf-8') as f:
+                self.previous = {record['name']: record for record in json.load(f)}
+            with open(fingerprints_path(self.output_path), encoding='utf-8') as f:
+                self.previous_fingerprints = json.load(f)
+        except (OSError, ValueError):
+            # No usable previous run: everything counts as changed
+            self.previous = {}
+            self.previous_fingerprints = {}
+
+    def lookup(self, source_fingerprint, image_dir=None):
+        """Return the previous record built from the same source, or None."""
+        if not self.enabled:
+            return None
+        record = self.previous.get(self.previous_fingerprints.get(source_fingerprint))
+        if record is None:
+            return None
+        # A deleted image means the entry must be refreshed anyway
+        if image_dir and record.get('image') and not os.path.exists(os.path.join(image_dir, record['image'])):
+            return None
+        with self._lock:
+            self.reused += 1
+        return record
+
+    def remember(self, source_fingerprint, name):
+        with self._lock:
+            self.fingerprints[source_fingerprint] = name
+
+    def save_fingerprints(self):
+        """Atomically write the fingerprints of this run next to the output."""
+        write_json_atomic(fingerprints_path(self.output_path), self.fingerprints)
@@ -0,0 +1,70 @@
+"""Optional tracemalloc report of a scraper run's peak memory.
+
+With --memory-report the Python allocations of the run are traced, and at
+exit the peak is printed together with the allocation sites still
+holding the most memory. scrape_all also reports each scraper's peak.
+Tracing slows allocation-heavy code down, so it is off by default.
+"""
+import atexit
+import tracemalloc
+
+TOP_LINES = 10  # allocation sites listed in a report
+
+_earlier_peak = 0  # highest peak before the last reset()
+
+
+def start():
+    """Start tracing allocations, if not already on."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def active():
+    return tracemalloc.is_tracing()
+
+
+def peak():
+    """Return the peak traced memory in bytes since start() or the last reset()."""
+    return tracemalloc.get_traced_memory()[1]
+
+
+def reset():
+    """Start measuring a new peak; report() still includes the earlier ones."""
+    global _earlier_peak
+    _earlier_peak = max(_earlier_peak, peak())
+    tracemalloc.reset_peak()
+
+
+def report(label="run", top=TOP_LINES):
+    """Return the peak memory report as text."""
+    current, peak_bytes = tracemalloc.get_traced_memory()
+    peak_bytes = max(peak_bytes, _earlier_peak)
+    lines = [f"Peak traced memory for {label}: {peak_bytes / 2**20:.1f} MiB (now {current / 2**20:.1f} MiB)"]
+    if top:
+        stats = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        )).statistics('lineno')
+        lines.append("Largest allocations still held:")
+        for stat in stats[:top]:
+            frame = stat.traceback[0]
+            lines.append(f"  {stat.size / 1024:>9.1f} KiB  {frame.filename}:{frame.lineno}")
+    return '\n'.join(lines)
+
+
+def finish():
+    print()
+    print(report())
+
+
+def add_arguments(parser):
+    group = parser.add_argument_group("memory")
+    group.add_argument('--memory-report', action='store_true',
+                       help="trace Python allocations and print the peak and the largest holders at exit")
+
+
+def configure_from_args(args):
+    """Apply the option added by add_arguments(); the report is printed at exit."""
+    if args.memory_report:
+        start()
+        atexit.register(finish)
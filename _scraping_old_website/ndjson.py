@@ -0,0 +1,101 @@
+"""Crash-safe streaming output for scraper records.
+
+Records are appended to ``<output>.ndjson`` one JSON object per line as
+soon as they are parsed, with a periodic fsync. finish() turns the stream
+into the usual pretty-printed ``<output>.json`` in a single pass and
+removes the stream. After a crash, the next run can resume: the records
+already in the stream are kept and reported in ``done`` so the scraper
+can skip them.
+"""
+import json
+import os
+
+FSYNC_EVERY = 25
+
+
+def stream_path(output_path):
+    root, _ = os.path.splitext(output_path)
+    return f"{root}.ndjson"
+
+
+def read_records(path):
+    """Yield the records of an NDJSON file, ignoring a torn last line."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                break
+            yield json.loads(line)
+
+
+def convert_to_json(ndjson_path, json_path, ensure_ascii=False):
+    """Write the records as a JSON array, byte-identical to json.dump(records, f, indent=2)."""
+    tmp_path = f"{json_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        count = 0
+        for record in read_records(ndjson_path):
+            f.write('[\n  ' if count == 0 else ',\n  ')
+            f.write(json.dumps(record, indent=2, ensure_ascii=ensure_ascii).replace('\n', '\n  '))
+            count += 1
+        f.write('\n]' if count else '[]')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, json_path)
+    return count
+
+
+class RecordWriter:
+    """Stream records for `output_path` as NDJSON, then convert to JSON."""
+
+    def __init__(self, output_path, resume=False, key='name', ensure_ascii=False, fsync_every=FSYNC_EVERY):
+        self.output_path = output_path
+        self.path = stream_path(output_path)
+        self.key = key
+        self.ensure_ascii = ensure_ascii
+        self.fsync_every = fsync_every
+        self.done = set()
+        self.count = 0
+        if resume and os.path.exists(self.path):
+            for record in read_records(self.path):
+                self.done.add(record[key])
+                self.count += 1
+            # Drop a torn last line so new records start on a clean line
+            self._truncate_to_valid()
+            self._file = open(self.path, 'a', encoding='utf-8')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+        self._unsynced = 0
+
+    def _truncate_to_valid(self):
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            f.truncate(data.rfind(b'\n') + 1)
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=self.ensure_ascii) + '\n')
+        self._file.flush()
+        self.done.add(record[self.key])
+        self.count += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def finish(self):
+        """Close the stream and replace the JSON output with its contents."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        convert_to_json(self.path, self.output_path, ensure_ascii=self.ensure_ascii)
+        os.remove(self.path)
+        return self.count
+
+    def close(self):
+        # Leave the stream in place for a later --resume
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,106 @@
+import importlib.util
+import re
+import time
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+import tracing
+
+# Tree builders BeautifulSoup can use, fastest first
+PARSERS = ('lxml', 'html.parser', 'html5lib')
+
+
+def available_parsers():
+    """Return the parser backends that are installed here."""
+    return [name for name in PARSERS if name == 'html.parser' or importlib.util.find_spec(name)]
+
+
+DEFAULT_PARSER = available_parsers()[0]
+
+_settings = {
+    "parser": DEFAULT_PARSER,
+    "partial": True,
+}
+
+
+def configure(parser=None, partial=None):
+    """Select the parser backend and whether scrapers may parse partially."""
+    if parser is not None:
+        if parser not in available_parsers():
+            raise ValueError(f"Parser {parser!r} is not available, use one of: {', '.join(available_parsers())}")
+        _settings["parser"] = parser
+    if partial is not None:
+        _settings["partial"] = partial
+
+
+def current_settings():
+    """Return the settings as keyword arguments for configure()."""
+    return dict(_settings)
+
+
+def decode(body, encoding):
+    """Turn raw page bytes into text exactly like requests' Response.text."""
+    try:
+        return str(body, encoding or 'utf-8', errors='replace')
+    except LookupError:
+        return str(body, 'utf-8', errors='replace')
+
+
+def class_pattern(*names):
+    # Matches the raw class attribute, which is not split into words yet
+    # while SoupStrainer decides whether to build a tag
+    return re.compile(r'(^|\s)(' + '|'.join(map(re.escape, names)) + r')(\s|$)')
+
+
+# Only the subtrees each scraper reads; a person page is parsed whole
+# because its email fallback searches the text of the entire page
+STRAINERS = {
+    "alumni": SoupStrainer('div', id='t-alumni'),
+    "tools": SoupStrainer('div', class_=class_pattern('resource')),
+    "publications": SoupStrainer(class_=class_pattern('publication', 'page-numbers')),
+}
+
+
+def make_soup(markup, scraper=None, parser=None):
+    """Parse `markup` with the configured backend.
+
+    When `scraper` names an entry of STRAINERS and partial parsing is on,
+    only the matching subtrees are built. html5lib always builds the full
+    tree because it does not support partial parsing.
+    """
+    parser = parser or _settings["parser"]
+    strainer = STRAINERS.get(scraper) if _settings["partial"] and parser != 'html5lib' else None
+    if not tracing.active:
+        return BeautifulSoup(markup, parser, parse_only=strainer)
+    start = time.perf_counter()
+    soup = BeautifulSoup(markup, parser, parse_only=strainer)
+    tracing.record_parse(start)
+    return soup
+
+
+def release(element):
+    """Free the parse tree `element` belongs to once the records are out of it.
+
+    BeautifulSoup trees are full of parent/sibling reference cycles, so
+    without this they wait for the cyclic garbage collector.
+    """
+    while element.parent is not None:
+        element = element.parent
+    # The BeautifulSoup root is not linked into its children's element
+    # chain, so decomposing it alone would leave them intact
+    for child in list(element.contents):
+        child.decompose()
+    element.decompose()
+
+
+def add_arguments(parser):
+    """Add the parser options to a scraper's argument parser."""
+    group = parser.add_argument_group("parsing")
+    group.add_argument('--parser', choices=PARSERS, default=DEFAULT_PARSER,
+                       help=f"HTML parser backend (default: {DEFAULT_PARSER})")
+    group.add_argument('--full-parse', action='store_true', help="build the whole tree instead of only the needed subtrees")
+
+
+def configure_from_args(args):
+    """Apply the options added by add_arguments()."""
+    configure(parser=args.parser, partial=not args.full_parse)
@@ -0,0 +1,161 @@
+"""Two-stage fetch/parse pipeline.
+
+Network I/O and BeautifulSoup parsing no longer take turns in one
+thread. A pool of fetch threads downloads raw page bodies into a bounded
+queue. The calling thread feeds them to a process pool, which parses them
+on other cores while the next pages download. Both stages are bounded:
+no more than `parse_workers * 2` parses are in flight, and fetchers only
+run `queue_size` pages ahead of those, holding a slot per page until its
+result is handed out. A slow parser, or a slow first download, throttles
+the downloads instead of piling up pages in memory.
+
+Parse functions run in worker processes, so they must be top-level
+functions. They take the fetch stage's payload (raw bytes and an
+encoding, never a live Response) and return picklable results.
+"""
+import collections
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import fetch
+import parsing
+
+QUEUE_SIZE = 8
+_DONE = object()
+
+
+class Failed:
+    """Stands in for the result of an item whose fetch or parse raised."""
+
+    __slots__ = ('error',)
+
+    def __init__(self, error):
+        self.error = error
+
+
+def _init_worker(parse_settings, base_url):
+    # Worker processes may be spawned fresh, so carry over the settings
+    # the parse functions depend on
+    parsing.configure(**parse_settings)
+    fetch.configure(base_url=base_url)
+
+
+def _fetch_stage(items, fetch_item, pages, workers, stop, slots):
+    todo = queue.Queue()
+    for entry in enumerate(items):
+        todo.put(entry)
+
+    def worker():
+        while not stop.is_set():
+            # One slot per page between fetch and delivery: this is the backpressure
+            if not slots.acquire(timeout=0.1):
+                continue
+            try:
+                index, item = todo.get_nowait()
+            except queue.Empty:
+                slots.release()
+                break
+            try:
+                payload = fetch_item(item)
+            except Exception as e:
+                payload = Failed(e)
+            pages.put((index, payload))
+        pages.put(_DONE)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def fetch_and_parse(items, fetch_item, parse_item, fetch_workers=4, parse_workers=None, queue_size=QUEUE_SIZE):
+    """Yield parse_item(fetch_item(item)) for every item, in the order of `items`.
+
+    fetch_item runs in `fetch_workers` threads and parse_item in a pool of
+    `parse_workers` processes (default: one per CPU). An item whose fetch
+    or parse raised yields a Failed holding the exception.
+    """
+    items = list(items)
+    parse_workers = parse_workers or os.cpu_count() or 1
+    pages = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    max_in_flight = parse_workers * 2
+    window = max_in_flight + queue_size  # pages between fetch and delivery
+    slots = threading.Semaphore(window)
+    fetchers = _fetch_stage(items, fetch_item, pages, max(1, min(fetch_workers, len(items))), stop, slots)
+    running = len(fetchers)
+    in_flight = {}  # index -> Future or Failed
+    waiting = {}  # index -> payload fetched while the parse stage was full
+    next_index = 0
+
+    def parsing_now():
+        return [future for future in in_flight.values() if not isinstance(future, Failed) and not future.done()]
+
+    # Spawned, not forked: the fetch threads are already running and may hold locks
+    executor = ProcessPoolExecutor(
+        max_workers=parse_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(parsing.current_settings(), fetch.site_url()),
+    )
+    try:
+        while next_index < len(items):
+            # Hand out finished results in order
+            while next_index in in_flight and (isinstance(in_flight[next_index], Failed) or in_flight[next_index].done()):
+                result = in_flight.pop(next_index)
+                if not isinstance(result, Failed):
+                    try:
+                        result = result.result()
+                    except Exception as e:
+                        result = Failed(e)
+                slots.release()
+                yield result
+                next_index += 1
+            if next_index >= len(items):
+                break
+            # Parse fetched pages, oldest first, while the parse stage has room
+            for index in sorted(waiting):
+                if len(parsing_now()) >= max_in_flight:
+                    break
+                in_flight[index] = executor.submit(parse_item, waiting.pop(index))
+
+            fetching = len(in_flight) + len(waiting) < window
+            if next_index in in_flight and (len(parsing_now()) >= max_in_flight or not running or not fetching):
+                # The parse stage is full or nothing else is coming: wait on the oldest
+                wait([in_flight[next_index]])
+            elif next_index in waiting:
+                # The stage is full of later pages: wait for room
+                wait(parsing_now(), return_when=FIRST_COMPLETED)
+            else:
+                entry = pages.get()
+                if entry is _DONE:
+                    running -= 1
+                    continue
+                index, payload = entry
+                if isinstance(payload, Failed):
+                    in_flight[index] = payload
+                else:
+                    waiting[index] = payload
+    finally:
+        executor.shutdown(cancel_futures=True)
+        # If the consumer stopped early, stop fetching and unblock the fetchers
+        stop.set()
+        while any(thread.is_alive() for thread in fetchers):
+            try:
+                pages.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def ordered_map(executor, function, iterable, window):
+    """Like executor.map, but consumes `iterable` lazily, `window` items ahead."""
+    pending = collections.deque()
+    for item in iterable:
+        pending.append(executor.submit(function, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,272 @@
+"""Typed records for everything the scrapers produce.
+
+Each record is a slotted dataclass. Its fields are the keys of the
+scraper's JSON output, in the same order. Its TSV columns are the headers
+of the Google Sheet that feeds the site (src/content/config.ts and the
+README), with careers, education and categories encoded the way the
+sheets expect. Scrapers call validate() before writing a record, so rows
+the site build would choke on are reported and skipped instead.
+"""
+import csv
+import io
+import json
+import re
+import typing
+from dataclasses import dataclass, field, fields, replace
+from typing import Dict, List
+
+ORCID = re.compile(r'\d{4}-\d{4}-\d{4}-\d{3}[\dX]')
+EMAIL = re.compile(r'[^@\s]+@[^@\s]+\.[^@\s]+')
+URL = re.compile(r'https?://\S+')
+YEAR = re.compile(r'\d{4}')
+PMID = re.compile(r'\d+')
+PMCID = re.compile(r'PMC\d+')
+DOI = re.compile(r'10\.\d{4,9}/\S+')
+
+ENTRY_SEPARATOR = ' || '
+PART_SEPARATOR = ' | '
+CATEGORIES = ('featured', 'tool', 'database')
+
+
+class InvalidRecord(ValueError):
+    """A scraped record that does not match the schema the site expects."""
+
+
+def escape_tsv(value):
+    # Same quoting as the _scripts/convert-*-to-tsv.js exporters
+    text = '' if value is None else str(value)
+    if '\t' in text or '\n' in text or '"' in text:
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+class Record:
+    """Shared JSON/TSV conversion and validation for the record types."""
+
+    __slots__ = ()
+    KEY = 'name'  # field identifying a record in messages and resumes
+    PATTERNS = {}  # field -> regex a non-empty value must match
+    SHEET_HEADERS = ()  # TSV columns, defaulting to the fields
+
+    @classmethod
+    def field_types(cls):
+        # Runtime types of the fields, worked out once per class
+        types = cls.__dict__.get('_field_types')
+        if types is None:
+            types = tuple((f.name, typing.get_origin(f.type) or f.type) for f in fields(cls))
+            setattr(cls, '_field_types', types)
+        return types
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a JSON object, ignoring keys it does not know."""
+        return cls(**{name: data[name] for name, _ in cls.field_types() if name in data})
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name, _ in self.field_types()}
+
+    def problems(self):
+        """Return a description of everything wrong with this record."""
+        problems = []
+        for name, kind in self.field_types():
+            value = getattr(self, name)
+            if not isinstance(value, kind):
+                problems.append(f"{name} should be {kind.__name__}, not {type(value).__name__}")
+        if not problems:
+            if not getattr(self, self.KEY).strip():
+                problems.append(f"{self.KEY} is empty")
+            for name, pattern in self.PATTERNS.items():
+                value = getattr(self, name)
+                if value and not pattern.fullmatch(value):
+                    problems.append(f"{name} {value!r} is malformed")
+            problems.extend(self.extra_problems())
+        return problems
+
+    def extra_problems(self):
+        return []
+
+    def drop_malformed(self):
+        """Clear the fields that don't match their PATTERNS entry; return a description of each."""
+        dropped = []
+        for name, pattern in self.PATTERNS.items():
+            value = getattr(self, name)
+            if isinstance(value, str) and value and not pattern.fullmatch(value):
+                dropped.append(f"{name} {value!r}: malformed")
+                setattr(self, name, "")
+        return dropped
+
+    def validate(self):
+        """Return the record itself, or raise InvalidRecord listing its problems."""
+        problems = self.problems()
+        if problems:
+            raise InvalidRecord(f"{type(self).__name__} {getattr(self, self.KEY, '')!r}: {'; '.join(problems)}")
+        return self
+
+    @classmethod
+    def headers(cls):
+        return cls.SHEET_HEADERS or tuple(name for name, _ in cls.field_types())
+
+    @classmethod
+    def unscraped_headers(cls):
+        # Sheet columns maintained by hand, such as a person's role
+        names = {name for name, _ in cls.field_types()}
+        return tuple(header for header in cls.headers() if header not in names)
+
+    def sheet_value(self, header):
+        return getattr(self, header)
+
+    @classmethod
+    def from_sheet_values(cls, row):
+        return cls.from_dict(row)
+
+    def sheet_row(self, extra=None):
+        """Return header -> sheet text, taking the unscraped columns from `extra`."""
+        extra = extra or {}
+        unscraped = self.unscraped_headers()
+        return {header: extra.get(header, '') if header in unscraped else self.sheet_value(header)
+                for header in self.headers()}
+
+    def to_tsv_row(self, extra=None):
+        return '\t'.join(escape_tsv(value) for value in self.sheet_row(extra).values())
+
+
+@dataclass(slots=True)
+class Person(Record):
+    name: str
+    description: str = ""
+    research_interests: str = ""
+    professional_career: List[Dict[str, str]] = field(default_factory=list)
+    education: List[Dict[str, str]] = field(default_factory=list)
+    email: str = ""
+    telephone: str = ""
+    orcid: str = ""
+    image: str = ""
+
+    PATTERNS = {'email': EMAIL, 'orcid': ORCID}
+    SHEET_HEADERS = ('name', 'role', 'description', 'research_interests', 'professional_career',
+                     'education', 'email', 'telephone', 'orcid', 'image')
+    ENTRY_KEYS = {'professional_career': 'position', 'education': 'degree'}
+
+    def extra_problems(self):
+        problems = []
+        for name, second in self.ENTRY_KEYS.items():
+            for entry in getattr(self, name):
+                if not isinstance(entry, dict) or set(entry) != {'period', second}:
+                    problems.append(f"{name} entry {entry!r} should have exactly period and {second}")
+        return problems
+
+    def sheet_value(self, header):
+        second = self.ENTRY_KEYS.get(header)
+        if second:
+            # "period | position || period | position"
+            return ENTRY_SEPARATOR.join(f"{entry['period']}{PART_SEPARATOR}{entry[second]}"
+                                        for entry in getattr(self, header))
+        return Record.sheet_value(self, header)
+
+    @classmethod
+    def from_sheet_values(cls, row):
+        row = dict(row)
+        for name, second in cls.ENTRY_KEYS.items():
+            entries = []
+            for text in filter(None, row.get(name, '').split(ENTRY_SEPARATOR)):
+                period, _, value = text.partition(PART_SEPARATOR)
+                entries.append({'period': period, second: value})
+            row[name] = entries
+        return cls.from_dict(row)
+
+
+@dataclass(slots=True)
+class Alumnus(Record):
+    name: str
+    linkedin: str = ""
+    duration: str = ""
+    position: str = ""
+
+    PATTERNS = {'linkedin': URL}
+    SHEET_HEADERS = ('name', 'position', 'duration', 'linkedin')
+
+
+@dataclass(slots=True)
+class Tool(Record):
+    name: str
+    short_description: str = ""
+    long_description: str = ""
+    code_repository: str = ""
+    website: str = ""
+    publication: str = ""
+    image: str = ""
+    categories: Dict[str, bool] = field(default_factory=lambda: dict.fromkeys(CATEGORIES, False))
+
+    PATTERNS = {'code_repository': URL, 'website': URL, 'publication': URL}
+    SHEET_HEADERS = ('name', 'short_description', 'long_description', 'code_repository',
+                     'website', 'publication', 'image', 'categories')
+
+    def extra_problems(self):
+        if set(self.categories) != set(CATEGORIES) or not all(isinstance(v, bool) for v in self.categories.values()):
+            return [f"categories {self.categories!r} should map {', '.join(CATEGORIES)} to booleans"]
+        return []
+
+    def sheet_value(self, header):
+        if header == 'categories':
+            # "featured, tool"
+            return ', '.join(name for name in CATEGORIES if self.categories[name])
+        return Record.sheet_value(self, header)
+
+    @staticmethod
+    def _chosen_categories(text):
+        return {name.strip() for name in text.split(',')}
+
+    def sheet_row(self, extra=None):
+        """Like Record.sheet_row, but "featured" is set by hand in the sheet, so it comes from `extra`."""
+        if extra is None:
+            return Record.sheet_row(self)
+        featured = 'featured' in self._chosen_categories(extra.get('categories', ''))
+        categories = dict(self.categories, featured=featured)
+        return Record.sheet_row(replace(self, categories=categories), extra)
+
+    @classmethod
+    def from_sheet_values(cls, row):
+        chosen = cls._chosen_categories(row.get('categories', ''))
+        return cls.from_dict(dict(row, categories={name: name in chosen for name in CATEGORIES}))
+
+
+@dataclass(slots=True)
+class Publication(Record):
+    title: str
+    url: str = ""
+    authors: str = ""
+    journal: str = ""
+    year: str = ""
+    # Filled in by identifiers.py, named as in the site's PMC loader
+    pmid: str = ""
+    pmcid: str = ""
+    doi: str = ""
+
+    KEY = 'title'
+    PATTERNS = {'url': URL, 'year': YEAR, 'pmid': PMID, 'pmcid': PMCID, 'doi': DOI}
+    IDENTIFIERS = ('pmid', 'pmcid', 'doi')
+
+    def to_dict(self):
+        # Identifiers appear in the JSON only once a lookup has found them
+        data = Record.to_dict(self)
+        for name in self.IDENTIFIERS:
+            if not data[name]:
+                del data[name]
+        return data
+
+
+def load_json_records(cls, path):
+    """Read a scraper JSON output as records of type `cls`."""
+    with open(path, encoding='utf-8') as f:
+        return [cls.from_dict(data) for data in json.load(f)]
+
+
+def to_tsv(records, cls):
+    """Return `records` as sheet-ready TSV: a header line, then one line per record."""
+    return '\n'.join(['\t'.join(cls.headers()), *(record.to_tsv_row() for record in records)])
+
+
+def from_tsv(text, cls):
+    """Parse TSV written by to_tsv (or the old Node exporters) back into records."""
+    reader = csv.DictReader(io.StringIO(text), delimiter='\t')
+    return [cls.from_sheet_values(row) for row in reader]
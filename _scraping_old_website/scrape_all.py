@@ -0,0 +1,150 @@
+"""Run any subset of the scrapers concurrently in one process.
+
+The scrapers share fetch's connection pool, cache and one rate limit for
+the whole run, and scrape_alumni and scrape_tools share a single homepage
+request. Outputs go to --output-dir under their usual names. A summary of
+timings and record counts is printed at the end.
+
+    python scrape_all.py [alumni] [publications] [team] [tools] [--output-dir DIR] [--rate N]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fetch
+import identifiers
+import memory
+import parsing
+import records
+import scrape_alumni
+import scrape_publications
+import scrape_team
+import scrape_tools
+import sheets
+
+
+def output(args, name):
+    return os.path.join(args.output_dir, name)
+
+
+def sheet_path(args, cls):
+    # --tsv writes each sheet to its usual file in _scripts/
+    return sheets.default_path(cls) if args.tsv else None
+
+
+def run_alumni(args):
+    return scrape_alumni.scrape_alumni(output_path=output(args, 'alumni.json'),
+                                       tsv_path=sheet_path(args, records.Alumnus), diff=args.diff)
+
+
+def run_publications(args):
+    return scrape_publications.main(resume=args.resume, concurrency=args.concurrency,
+                                    fuzzy_dedup=args.fuzzy_dedup, output_path=output(args, 'publications.json'),
+                                    parse_workers=args.parse_workers,
+                                    lookup_ids=identifiers.options_from_args(args) if args.identifiers else None)
+
+
+def run_team(args):
+    return scrape_team.main(workers=args.workers, incremental_mode=args.incremental, variants=args.variants,
+                            resume=args.resume, team_path=args.team_file,
+                            output_path=output(args, 'team_details.json'), image_dir=output(args, 'team_images'),
+                            tsv_path=sheet_path(args, records.Person), diff=args.diff,
+                            parse_workers=args.parse_workers)
+
+
+def run_tools(args):
+    return scrape_tools.main(incremental_mode=args.incremental, variants=args.variants,
+                             output_path=output(args, 'tools_details.json'), image_dir=output(args, 'tool_images'),
+                             tsv_path=sheet_path(args, records.Tool), diff=args.diff, workers=args.workers)
+
+
+# Each job returns its record count, or None if the scraper gave up
+JOBS = {
+    'alumni': run_alumni,
+    'publications': run_publications,
+    'team': run_team,
+    'tools': run_tools,
+}
+
+
+def run_job(name, args):
+    if memory.active():
+        memory.reset()
+    start = time.perf_counter()
+    try:
+        count = JOBS[name](args)
+    except Exception as e:
+        print(f"{name} failed: {e}")
+        count = None
+    return name, count, time.perf_counter() - start, memory.peak() if memory.active() else None
+
+
+def run_jobs(names, args):
+    """Run the named jobs in parallel threads and return (name, count, seconds, peak bytes) in order.
+
+    With --memory-report they run one after another instead, so each
+    peak belongs to one scraper.
+    """
+    if memory.active():
+        return [run_job(name, args) for name in names]
+    with ThreadPoolExecutor(max_workers=len(names)) as executor:
+        return list(executor.map(lambda name: run_job(name, args), names))
+
+
+def print_summary(results, elapsed):
+    show_peak = any(peak is not None for *_, peak in results)
+    print()
+    print(f"{'scraper':<14} {'status':<8} {'records':>8} {'seconds':>8}" + (f" {'peak MiB':>9}" if show_peak else ''))
+    for name, count, seconds, peak in results:
+        status = 'ok' if count is not None else 'failed'
+        shown = count if count is not None else '-'
+        print(f"{name:<14} {status:<8} {shown:>8} {seconds:>8.1f}" + (f" {peak / 2**20:>9.1f}" if show_peak else ''))
+    print(f"{'total':<14} {'':<8} {sum(count or 0 for _, count, *_ in results):>8} {elapsed:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scrapers', nargs='*', metavar='SCRAPER',
+                        help=f"scrapers to run: {', '.join(JOBS)} (default: all)")
+    parser.add_argument('--output-dir', default='.', help="directory for the JSON outputs and images")
+    parser.add_argument('--team-file', default=scrape_team.TEAM_FILE, help="JSON file listing the current team members")
+    parser.add_argument('--rate', type=float, default=3.0, help="maximum requests per second per host, shared by all scrapers (0 = no limit)")
+    parser.add_argument('--workers', type=int, default=4, help="team members scraped and tool images downloaded in parallel")
+    parser.add_argument('--concurrency', type=int, default=4, help="publication listing pages fetched at once")
+    parser.add_argument('--parse-workers', type=int, default=0, help="parse team and publication pages in this many processes (0 = in the fetching threads)")
+    parser.add_argument('--incremental', action='store_true', help="only re-parse team members and tools that changed")
+    parser.add_argument('--resume', action='store_true', help="continue interrupted team and publication runs")
+    parser.add_argument('--fuzzy-dedup', action='store_true', help="also merge near-duplicate publications")
+    parser.add_argument('--identifiers', action='store_true', help="also look up publication PMIDs, PMCIDs and DOIs")
+    parser.add_argument('--variants', choices=['webp', 'avif'], help="also build resized image variants")
+    parser.add_argument('--tsv', action='store_true', help="also write the sheet-ready TSVs in _scripts/")
+    parser.add_argument('--diff', action='store_true', help="print the rows that differ from the TSVs in _scripts/ instead")
+    identifiers.add_arguments(parser)
+    fetch.add_arguments(parser)
+    parsing.add_arguments(parser)
+    args = parser.parse_args()
+
+    names = args.scrapers or list(JOBS)
+    unknown = [name for name in names if name not in JOBS]
+    if unknown:
+        parser.error(f"unknown scraper {unknown[0]!r}, choose from {', '.join(JOBS)}")
+    names = list(dict.fromkeys(names))
+
+    fetch.setup_logging()
+    fetch.configure_from_args(args)
+    parsing.configure_from_args(args)
+    # One pool and one limiter for everything; the scrapers keep them as they are
+    pool_size = args.workers + args.concurrency + len(names)
+    fetch.configure(rate_limit=args.rate or None, pool_size=pool_size)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    results = run_jobs(names, args)
+    print_summary(results, time.perf_counter() - start)
+    if any(count is None for _, count, *_ in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
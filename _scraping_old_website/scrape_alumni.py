@@ -1,8 +1,14 @@
-import json
+import argparse
 import requests
-from bs4 import BeautifulSoup
 import re
 
+import fetch
+import ndjson
+import parsing
+import records
+import sheets
+import tracing
+
 def clean_duration(duration):
     # Remove any extra spaces and normalize the format
     duration = duration.strip()
@@ -17,59 +23,84 @@ def clean_position(position):
     position = ' '.join(position.split())
     return position
 
-def scrape_alumni():
+@tracing.extracts
+def parse_alumni(html):
+    """Return the alumni records from the homepage HTML, or None if the table is missing."""
+    soup = parsing.make_soup(html, 'alumni')
+    
+    # Find the alumni table
+    alumni_div = soup.find('div', id='t-alumni')
+    if not alumni_div:
+        print("Could not find alumni table on the page")
+        return None
+    
+    table = alumni_div.find('table', class_='table')
+    if not table:
+        print("Could not find alumni table in the alumni section")
+        return None
+    
+    # Initialize list to store alumni data
+    alumni_data = []
+    
+    # Skip the header row and process each row
+    for row in table.find_all('tr')[1:]:  # Skip header row
+        cols = row.find_all('td')
+        if len(cols) == 3:  # Ensure we have all three columns
+            name_link = cols[0].find('a')
+            name = name_link.text.strip() if name_link else cols[0].text.strip()
+            linkedin = name_link['href'].strip() if name_link and 'href' in name_link.attrs else ""
+            duration = clean_duration(cols[1].text)
+            position = clean_position(cols[2].text)
+            
+            alumnus = records.Alumnus(name=name, linkedin=linkedin, duration=duration, position=position)
+            try:
+                alumni_data.append(alumnus.validate())
+            except records.InvalidRecord as e:
+                print(f"Skipping alumni row: {e}")
+    
+    # The records hold plain strings, so the tree can go now
+    parsing.release(soup)
+    return alumni_data
+
+def scrape_alumni(output_path='alumni.json', tsv_path=None, diff=False):
     # URL of the website
-    url = "https://saezlab.org/"
+    url = fetch.site_url("/")
     
     try:
-        # Fetch the webpage content
-        response = requests.get(url)
+        # Fetch the webpage content, shared with scrape_tools in a combined run
+        response = fetch.get_shared(url)
         response.raise_for_status()  # Raise an exception for bad status codes
         
-        # Parse the HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find the alumni table
-        alumni_div = soup.find('div', id='t-alumni')
-        if not alumni_div:
-            print("Could not find alumni table on the page")
-            return
-        
-        table = alumni_div.find('table', class_='table')
-        if not table:
-            print("Could not find alumni table in the alumni section")
-            return
-        
-        # Initialize list to store alumni data
-        alumni_data = []
-        
-        # Skip the header row and process each row
-        for row in table.find_all('tr')[1:]:  # Skip header row
-            cols = row.find_all('td')
-            if len(cols) == 3:  # Ensure we have all three columns
-                name_link = cols[0].find('a')
-                name = name_link.text.strip() if name_link else cols[0].text.strip()
-                linkedin = name_link['href'] if name_link and 'href' in name_link.attrs else ""
-                duration = clean_duration(cols[1].text)
-                position = clean_position(cols[2].text)
-                
-                alumni_data.append({
-                    "name": name,
-                    "linkedin": linkedin,
-                    "duration": duration,
-                    "position": position
-                })
+        alumni_data = parse_alumni(response.text)
+        if alumni_data is None:
+            return None
         
-        # Save to JSON file
-        with open('alumni.json', 'w', encoding='utf-8') as f:
-            json.dump(alumni_data, f, indent=2, ensure_ascii=False)
+        # Save to JSON file through the same crash-safe stream as the other scrapers
+        # and, if asked, straight to the sheet TSV
+        with ndjson.RecordWriter(output_path) as writer, sheets.SheetWriter(records.Alumnus, tsv_path, diff) as sheet:
+            for alumnus in alumni_data:
+                writer.write(alumnus.to_dict())
+                sheet.write(alumnus)
+            writer.finish()
+            sheet.finish()
         
         print(f"Scraped information for {len(alumni_data)} alumni members")
+        return len(alumni_data)
     
     except requests.exceptions.RequestException as e:
         print(f"Error fetching the webpage: {e}")
     except Exception as e:
         print(f"An error occurred: {e}")
+    return None
 
 if __name__ == "__main__":
-    scrape_alumni() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape the alumni table from saezlab.org")
+    fetch.add_arguments(parser)
+    parsing.add_arguments(parser)
+    sheets.add_arguments(parser, records.Alumnus)
+    args = parser.parse_args()
+    fetch.setup_logging()
+    fetch.configure_from_args(args)
+    parsing.configure_from_args(args)
+    scrape_alumni(tsv_path=args.tsv, diff=args.diff)
+ 
\ No newline at end of file
@@ -1,14 +1,56 @@
-import requests
-from bs4 import BeautifulSoup
+import argparse
+import asyncio
+import collections
+import itertools
 import json
-from typing import List, Dict
-import time
-from pathlib import Path
+import os
+import re
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
-def get_publications_from_page(url: str) -> List[Dict]:
-    """Get publications from a single page."""
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
+import dedup
+import fetch
+import identifiers
+import ndjson
+import parsing
+import pipeline
+import records
+import tracing
+from incremental import write_json_atomic
+
+PAGE_NUMBER = re.compile(r'/page/(\d+)/?')
+ET_AL = re.compile(r'(.*?\bet al)\.\s*(.*)', re.DOTALL)
+
+class ListingPage(NamedTuple):
+    publications: List[records.Publication]
+    next_url: Optional[str]
+    page_urls: Dict[int, str]  # page number -> URL, from the pagination links
+
+def split_bib_ref(ref_text: str) -> Optional[Tuple[str, str, str]]:
+    """Split "Authors. Journal, Year" into its parts, or return None.
+    
+    The year follows the last comma. The authors end at "et al." if they
+    are abbreviated, otherwise at the last ". " before the journal, so
+    initials in the author list ("Smith J. A.") survive.
+    """
+    head, comma, year = ref_text.rpartition(',')
+    match = ET_AL.match(head)
+    if match:
+        authors, journal = match.groups()
+    else:
+        authors, stop, journal = head.rpartition('. ')
+        if not stop:
+            # No ". " at all: fall back to the first full stop
+            authors, stop, journal = head.partition('.')
+        if not stop:
+            return None
+    if not comma:
+        return None
+    return authors.strip(), journal.strip(), year.strip()
+
+@tracing.extracts
+def parse_publications_page(html: str) -> ListingPage:
+    """Parse the publications, next page URL and pagination links out of a listing page."""
+    soup = parsing.make_soup(html, 'publications')
     publications = []
     
     for pub_div in soup.find_all('div', class_='publication'):
@@ -24,38 +66,51 @@ def get_publications_from_page(url: str) -> List[Dict]:
         if not bib_ref:
             continue
             
-        # Split the reference into authors and journal/year
-        ref_text = bib_ref.text.strip()
-        parts = ref_text.split('.', 1)
-        if len(parts) != 2:
+        # Split the reference into authors, journal and year
+        parts = split_bib_ref(bib_ref.text.strip())
+        if parts is None:
             continue
-            
-        authors = parts[0].strip()
-        journal_info = parts[1].strip()
+        authors, journal, year = parts
         
-        # Split journal info into journal and year
-        journal_parts = journal_info.split(',', 1)
-        if len(journal_parts) != 2:
+        publication = records.Publication(title=title, url=url, authors=authors, journal=journal, year=year)
+        try:
+            publications.append(publication.validate())
+        except records.InvalidRecord as e:
+            print(f"Skipping publication: {e}")
+    
+    # Find the next page and the numbered page links from the same parse
+    next_link = soup.find('a', class_='next page-numbers')
+    next_url = next_link['href'] if next_link else None
+    page_urls = {}
+    for link in soup.find_all('a', class_='page-numbers'):
+        if 'next' in link['class'] or 'prev' in link['class']:
             continue
-            
-        journal = journal_parts[0].strip()
-        year = journal_parts[1].strip()
-        
-        publications.append({
-            'title': title,
-            'url': url,
-            'authors': authors,
-            'journal': journal,
-            'year': year
-        })
-    
-    return publications
+        match = PAGE_NUMBER.search(link.get('href', ''))
+        if match:
+            page_urls[int(match.group(1))] = link['href']
+    
+    # The records hold plain strings, so the tree can go now
+    parsing.release(soup)
+    return ListingPage(publications, next_url, page_urls)
+
+def get_publications_from_page(url: str) -> ListingPage:
+    """Get publications, next page URL and pagination links from a single page."""
+    response = fetch.get(url)
+    return parse_publications_page(response.text)
+
+def parse_listing_body(payload) -> ListingPage:
+    """Parse a listing page fetched with fetch.get_body(); runs in a parse worker process."""
+    body, encoding = payload
+    return parse_publications_page(parsing.decode(body, encoding))
 
-def get_all_publications() -> List[Dict]:
-    """Get all publications across all pages."""
-    base_url = "https://saezlab.org/publication/"
-    all_publications = []
-    seen_titles = set()  # To prevent duplicates
+def get_all_publications(skip_titles: Iterable[str] = ()) -> Iterator[records.Publication]:
+    """Yield unique publications across all pages as each page is scraped.
+    
+    Titles in `skip_titles` (e.g. already written by an interrupted run)
+    are treated as seen and not yielded again.
+    """
+    base_url = fetch.site_url("/publication/")
+    seen_titles = set(skip_titles)  # To prevent duplicates
     
     # Get first page
     current_url = base_url
@@ -63,40 +118,195 @@ def get_all_publications() -> List[Dict]:
     
     while True:
         print(f"Scraping page {page}...")
-        publications = get_publications_from_page(current_url)
+        publications, next_url, _ = get_publications_from_page(current_url)
         
         # Filter out duplicates
-        new_publications = []
         for pub in publications:
-            if pub['title'] not in seen_titles:
-                seen_titles.add(pub['title'])
-                new_publications.append(pub)
-        
-        all_publications.extend(new_publications)
+            if pub.title not in seen_titles:
+                seen_titles.add(pub.title)
+                yield pub
         
-        # Check for next page
-        response = requests.get(current_url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        next_link = soup.find('a', class_='next page-numbers')
-        
-        if not next_link:
+        if not next_url:
             break
             
-        current_url = next_link['href']
+        current_url = next_url
         page += 1
-        time.sleep(1)  # Be nice to the server
+        fetch.pause(1)  # Be nice to the server
+
+def guess_page_urls(page_urls: Dict[int, str]) -> Optional[List[str]]:
+    """URLs of pages 2..N from the first page's pagination, or None if unreadable."""
+    if not page_urls:
+        return None
+    last_page = max(page_urls)
+    # WordPress elides middle pages ("1 2 3 ... 28"), so fill gaps from a known URL
+    url = next(iter(page_urls.values()))
+    match = PAGE_NUMBER.search(url)
+    template = url[:match.start(1)] + '{}' + url[match.end(1):]
+    return [page_urls.get(page) or template.format(page) for page in range(2, last_page + 1)]
+
+async def crawl_listing_pages(concurrency: int) -> AsyncIterator[List[records.Publication]]:
+    """Yield each listing page's publications in page order.
+    
+    The first page tells us how many pages there are, so the rest are
+    fetched concurrently (at most `concurrency` in flight, paced by the
+    fetch rate limit). Without readable pagination this falls back to
+    following the next-page links one at a time.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def fetch_page(url):
+        async with semaphore:
+            return await asyncio.to_thread(get_publications_from_page, url)
+    
+    print("Scraping page 1...")
+    first = await fetch_page(fetch.site_url("/publication/"))
+    yield first.publications
+    
+    if not first.next_url:
+        return
+    page_urls = guess_page_urls(first.page_urls)
+    if page_urls is None:
+        # Page count unknown: walk the next links
+        next_url = first.next_url
+        while next_url:
+            page = await fetch_page(next_url)
+            yield page.publications
+            next_url = page.next_url
+        return
+    
+    print(f"Fetching pages 2-{len(page_urls) + 1} with {concurrency} concurrent requests...")
+    # Schedule a window of pages ahead and drop each task once consumed, so
+    # finished pages (and their pagination dicts) don't pile up over the crawl
+    urls = iter(page_urls)
+    tasks = collections.deque(asyncio.create_task(fetch_page(url)) for url in itertools.islice(urls, concurrency * 2))
+    try:
+        # Await in page order so output order and dedup match the sequential crawl
+        while tasks:
+            page = await tasks.popleft()
+            for url in itertools.islice(urls, 1):
+                tasks.append(asyncio.create_task(fetch_page(url)))
+            yield page.publications
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def get_all_publications_concurrent(concurrency: int = 4, skip_titles: Iterable[str] = ()) -> Iterator[records.Publication]:
+    """Like get_all_publications, but prefetching listing pages concurrently."""
+    seen_titles = set(skip_titles)  # To prevent duplicates
+    loop = asyncio.new_event_loop()
+    pages = crawl_listing_pages(concurrency)
+    try:
+        while True:
+            try:
+                publications = loop.run_until_complete(pages.__anext__())
+            except StopAsyncIteration:
+                break
+            for pub in publications:
+                if pub.title not in seen_titles:
+                    seen_titles.add(pub.title)
+                    yield pub
+    finally:
+        loop.run_until_complete(pages.aclose())
+        loop.close()
+
+def get_all_publications_pipelined(concurrency: int = 4, parse_workers: Optional[int] = None,
+                                   skip_titles: Iterable[str] = ()) -> Iterator[records.Publication]:
+    """Like get_all_publications_concurrent, but parsing in worker processes.
     
-    return all_publications
+    Pages 2..N download in `concurrency` threads into a bounded queue while
+    `parse_workers` processes parse the pages already fetched.
+    """
+    seen_titles = set(skip_titles)  # To prevent duplicates
+    
+    def unique(publications):
+        for pub in publications:
+            if pub.title not in seen_titles:
+                seen_titles.add(pub.title)
+                yield pub
+    
+    print("Scraping page 1...")
+    first = get_publications_from_page(fetch.site_url("/publication/"))
+    yield from unique(first.publications)
+    if not first.next_url:
+        return
+    
+    page_urls = guess_page_urls(first.page_urls)
+    if page_urls is None:
+        # Page count unknown: walk the next links
+        next_url = first.next_url
+        while next_url:
+            page = get_publications_from_page(next_url)
+            yield from unique(page.publications)
+            next_url = page.next_url
+        return
+    
+    print(f"Fetching pages 2-{len(page_urls) + 1} with {concurrency} downloads, parsing in worker processes...")
+    for page in pipeline.fetch_and_parse(page_urls, fetch.get_body, parse_listing_body, concurrency, parse_workers):
+        if isinstance(page, pipeline.Failed):
+            raise page.error
+        yield from unique(page.publications)
+
+def merge_near_duplicates(path: str = "publications.json") -> int:
+    """Merge case, punctuation and preprint variants of the same paper in `path`.
+    
+    The merges are listed next to it, in publications_merges.json for
+    publications.json.
+    """
+    with open(path, encoding='utf-8') as f:
+        publications = json.load(f)
+    kept, report = dedup.deduplicate(publications)
+    report_path = f"{os.path.splitext(path)[0]}_merges.json"
+    write_json_atomic(path, kept, ensure_ascii=True)
+    write_json_atomic(report_path, report)
+    print(f"Merged {len(report)} near-duplicate publications, see {report_path}")
+    return len(kept)
 
-def main():
-    # Get all publications
-    publications = get_all_publications()
+def main(resume=False, concurrency=4, rate=None, fuzzy_dedup=False, output_path="publications.json", parse_workers=0,
+         lookup_ids=None):
+    # Stream every publication to disk as soon as its page is parsed
+    with ndjson.RecordWriter(output_path, resume=resume, key='title', ensure_ascii=True) as writer:
+        if concurrency > 1:
+            # Be nice to the server: limit requests per host instead of sleeping
+            # (rate=None keeps the limit a combined run already configured)
+            if rate is not None:
+                fetch.configure(rate_limit=rate, pool_size=concurrency)
+            if parse_workers:
+                publications = get_all_publications_pipelined(concurrency, parse_workers, skip_titles=writer.done)
+            else:
+                publications = get_all_publications_concurrent(concurrency, skip_titles=writer.done)
+        else:
+            publications = get_all_publications(skip_titles=writer.done)
+        for publication in publications:
+            writer.write(publication.to_dict())
+        
+        # Save to JSON
+        count = writer.finish()
     
-    # Save to JSON
-    with open("publications.json", "w") as f:
-        json.dump(publications, f, indent=2)
+    if fuzzy_dedup:
+        count = merge_near_duplicates(output_path)
     
-    print(f"Saved {len(publications)} unique publications to dumps/publications.json")
+    # Optional: PMIDs, PMCIDs and DOIs from Europe PMC (lookup_ids holds identifiers.enrich() options)
+    if lookup_ids is not None:
+        identifiers.enrich_file(output_path, **lookup_ids)
+    print(f"Saved {count} unique publications to {output_path}")
+    return count
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape the publication listing from saezlab.org")
+    parser.add_argument('--resume', action='store_true', help="continue an interrupted run from its last written record")
+    parser.add_argument('--concurrency', type=int, default=4, help="listing pages fetched at once (1 = follow next links one by one)")
+    parser.add_argument('--rate', type=float, default=2.0, help="maximum requests per second per host when concurrent (0 = no limit)")
+    parser.add_argument('--parse-workers', type=int, default=0, help="when concurrent, parse pages in this many processes while others download (0 = parse in the fetching threads)")
+    parser.add_argument('--fuzzy-dedup', action='store_true', help="also merge near-duplicate titles and list the merges in publications_merges.json")
+    parser.add_argument('--identifiers', action='store_true', help="also look up PMIDs, PMCIDs and DOIs on Europe PMC")
+    identifiers.add_arguments(parser)
+    fetch.add_arguments(parser)
+    parsing.add_arguments(parser)
+    args = parser.parse_args()
+    fetch.setup_logging()
+    fetch.configure_from_args(args)
+    parsing.configure_from_args(args)
+    main(resume=args.resume, concurrency=args.concurrency, rate=args.rate, fuzzy_dedup=args.fuzzy_dedup,
+         parse_workers=args.parse_workers,
+         lookup_ids=identifiers.options_from_args(args) if args.identifiers else None)
+ 
\ No newline at end of file
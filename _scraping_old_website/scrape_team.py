@@ -1,86 +1,31 @@
+import argparse
 import json
 import requests
-from bs4 import BeautifulSoup
 import re
-from urllib.parse import quote
 import time
-import unicodedata
 import os
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+import fetch
+import image_variants
+import images
+import incremental
+import ndjson
+import parsing
+import pipeline
+import records
+import sheets
+import slug_index
+import slugs
+import tracing
+
+# The team list the website is built from, found from this script's directory
+TEAM_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'content', '_team', 'team.json')
 
 def clean_name(name):
-    # Special case mappings for specific names
-    special_cases = {
-        "Jan Lanzer": "jan-david-lanzer",
-        "Thorben Söhngen": "thorben-hennig"
-    }
-    
-    # Check if this is a special case
-    if name in special_cases:
-        return special_cases[name]
-    
-    # Convert to lowercase
-    name = name.lower()
-    
-    # Replace specific special characters with their ASCII equivalents
-    char_map = {
-        'ä': 'a',
-        'ö': 'o',
-        'ü': 'u',
-        'ß': 'ss',
-        'ñ': 'n',
-        'é': 'e',
-        'è': 'e',
-        'ê': 'e',
-        'ë': 'e',
-        'á': 'a',
-        'à': 'a',
-        'â': 'a',
-        'ã': 'a',
-        'å': 'a',
-        'ç': 'c',
-        'í': 'i',
-        'ì': 'i',
-        'î': 'i',
-        'ï': 'i',
-        'ó': 'o',
-        'ò': 'o',
-        'ô': 'o',
-        'õ': 'o',
-        'ú': 'u',
-        'ù': 'u',
-        'û': 'u',
-        'ý': 'y',
-        'ÿ': 'y',
-        'æ': 'ae',
-        'œ': 'oe',
-        'ø': 'o',
-        'å': 'a',
-        'ł': 'l',
-        'ń': 'n',
-        'ś': 's',
-        'ź': 'z',
-        'ż': 'z',
-        'ć': 'c',
-        'ę': 'e',
-        'ą': 'a',
-        'š': 's',
-        'č': 'c',
-        'ž': 'z',
-        'đ': 'd'
-    }
-    
-    # Replace special characters
-    for char, replacement in char_map.items():
-        name = name.replace(char, replacement)
-    
-    # Remove any remaining special characters except hyphens and spaces
-    name = re.sub(r'[^a-z0-9\s-]', '', name)
-    
-    # Replace spaces with hyphens
-    name = '-'.join(name.split())
-    
-    return name
+    # Slug used for profile URLs and image filenames
+    return slugs.slugify(name)
 
 def download_image(url, name, image_dir):
     if not url:
@@ -95,16 +40,9 @@ def download_image(url, name, image_dir):
         
         # Create filename from person's name
         filename = f"{clean_name(name)}{file_ext}"
-        filepath = os.path.join(image_dir, filename)
-        
-        # Download the image
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
         
-        # Save the image
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        # Download into the shared content-addressed store
+        images.get_store(image_dir).save(url, filename)
         
         return filename
     
@@ -117,152 +55,335 @@ def extract_text_from_element(element):
         return element.get_text(strip=True)
     return ""
 
-def scrape_person_info(name, image_dir):
-    base_url = "https://saezlab.org/person/"
-    url = base_url + clean_name(name) + "/"
-    
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+# Section heading -> (tag holding its content, result field)
+SECTIONS = {
+    'Research Interests': ('p', 'research_interests'),
+    'Professional Career': ('table', 'professional_career'),
+    'Education': ('table', 'education'),
+}
+TABLE_KEYS = {
+    'professional_career': ('period', 'position'),
+    'education': ('period', 'degree'),
+}
+
+def has_class(tag, name):
+    return name in tag.get('class', ())
+
+def timed(profile, field, handler, *args):
+    # Per-field profiling hook: accumulate handler time in `profile` if given
+    if profile is None:
+        return handler(*args)
+    start = time.perf_counter()
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Initialize result dictionary
-        result = {
-            "name": name,
-            "description": "",
-            "research_interests": "",
-            "professional_career": [],
-            "education": [],
-            "email": "",
-            "telephone": "",
-            "orcid": "",
-            "image": ""
-        }
-        
-        # Extract image
-        img = soup.find('img', class_='img-responsive')
-        if img and 'src' in img.attrs:
-            image_url = img['src']
-            if image_url.startswith('/'):
-                image_url = 'https://saezlab.org' + image_url
-            image_filename = download_image(image_url, name, image_dir)
-            if image_filename:
-                result["image"] = image_filename
-        
-        # Extract description
-        desc_div = soup.find('div', class_='desc')
-        if desc_div:
-            result["description"] = extract_text_from_element(desc_div)
-        
-        # Extract research interests
-        research_section = soup.find('h3', string='Research Interests')
-        if research_section:
-            next_p = research_section.find_next('p')
-            if next_p:
-                result["research_interests"] = extract_text_from_element(next_p)
-        
-        # Extract professional career
-        career_section = soup.find('h3', string='Professional Career')
-        if career_section:
-            table = career_section.find_next('table')
-            if table:
-                for row in table.find_all('tr'):
-                    cols = row.find_all('td')
-                    if len(cols) == 2:
-                        result["professional_career"].append({
-                            "period": cols[0].get_text(strip=True),
-                            "position": cols[1].get_text(strip=True)
-                        })
-        
-        # Extract education
-        education_section = soup.find('h3', string='Education')
-        if education_section:
-            table = education_section.find_next('table')
-            if table:
-                for row in table.find_all('tr'):
-                    cols = row.find_all('td')
-                    if len(cols) == 2:
-                        result["education"].append({
-                            "period": cols[0].get_text(strip=True),
-                            "degree": cols[1].get_text(strip=True)
-                        })
-        
-        # Extract contact information
-        contact_divs = soup.find_all('div', class_='contact')
-        for contact in contact_divs:
-            # Extract telephone
-            tel_link = contact.find('a', href=lambda x: x and x.startswith('tel:'))
-            if tel_link:
-                result["telephone"] = tel_link.get_text(strip=True).replace('Direct:', '').strip()
-            
-            # Extract ORCID
-            orcid_link = contact.find('a', href=lambda x: x and 'orcid.org' in str(x))
-            if orcid_link:
-                orcid_text = orcid_link.get_text(strip=True)
-                # Extract ORCID ID (format: 0000-0000-0000-0000)
-                orcid_match = re.search(r'\d{4}-\d{4}-\d{4}-\d{4}', orcid_text)
-                if orcid_match:
-                    result["orcid"] = orcid_match.group(0)
-                else:
-                    result["orcid"] = orcid_text
-            
-            # Extract email from imMail spans
-            im_mail = contact.find('span', class_='imMail')
-            if im_mail:
-                # First try to get the email from the text content
-                email_text = im_mail.get_text(strip=True)
-                if '@' in email_text:
-                    result["email"] = email_text
-                # If no email in text, try to construct from data-mail attribute
-                elif 'data-mail' in im_mail.attrs:
-                    data_mail = im_mail['data-mail']
-                    # The format is usually "domain.foo_bar.username"
-                    parts = data_mail.split('.')
-                    if len(parts) >= 3:
-                        domain = parts[0].replace('_', '.')
-                        username = parts[-1].replace('_', '.')
-                        result["email"] = f"{username}@{domain}"
+        return handler(*args)
+    finally:
+        profile[field] = profile.get(field, 0.0) + time.perf_counter() - start
+
+def parse_section(element, field, result):
+    if field == 'research_interests':
+        result.research_interests = extract_text_from_element(element)
+        return
+    first, second = TABLE_KEYS[field]
+    entries = getattr(result, field)
+    for row in element.find_all('tr'):
+        cols = row.find_all('td')
+        if len(cols) == 2:
+            entries.append({
+                first: cols[0].get_text(strip=True),
+                second: cols[1].get_text(strip=True)
+            })
+
+def parse_contact(contact, result):
+    # One walk over the contact block finds its first phone, ORCID and email
+    tel_link = orcid_link = im_mail = None
+    for element in contact.descendants:
+        if element.name == 'a':
+            href = element.get('href')
+            if tel_link is None and href and href.startswith('tel:'):
+                tel_link = element
+            if orcid_link is None and href and 'orcid.org' in str(href):
+                orcid_link = element
+        elif element.name == 'span' and im_mail is None and has_class(element, 'imMail'):
+            im_mail = element
+    
+    # Extract telephone
+    if tel_link:
+        result.telephone = tel_link.get_text(strip=True).replace('Direct:', '').strip()
+    
+    # Extract ORCID
+    if orcid_link:
+        # Extract ORCID ID (format: 0000-0000-0000-000X) from the link text, else from its URL
+        orcid_match = (records.ORCID.search(orcid_link.get_text(strip=True))
+                       or records.ORCID.search(orcid_link.get('href', '')))
+        if orcid_match:
+            result.orcid = orcid_match.group(0)
+        else:
+            print(f"Ignoring ORCID link without an iD for {result.name}: {orcid_link.get('href')}")
+    
+    # Extract email from imMail spans
+    if im_mail:
+        # First try to get the email from the text content
+        email_text = im_mail.get_text(strip=True)
+        if '@' in email_text:
+            result.email = email_text
+        # If no email in text, try to construct from data-mail attribute
+        elif 'data-mail' in im_mail.attrs:
+            data_mail = im_mail['data-mail']
+            # The format is usually "domain.foo_bar.username"
+            parts = data_mail.split('.')
+            if len(parts) >= 3:
+                domain = parts[0].replace('_', '.')
+                username = parts[-1].replace('_', '.')
+                result.email = f"{username}@{domain}"
+
+@tracing.extracts
+def parse_person_page(html, name, profile=None):
+    """Parse a person page into a records.Person and the URL of their photo.
+    
+    The document is walked once; each element that matters is handed to
+    the handler for its field. Pass a dict as `profile` to collect the
+    seconds spent per field.
+    """
+    soup = timed(profile, 'parse', parsing.make_soup, html)
+    
+    result = records.Person(name=name)
+    image_url = ""
+    img_found = desc_found = False
+    headings_found = set()
+    waiting = []  # (tag name, field) for sections whose content comes next
+    strings = []  # page text, only joined if the email fallback is needed
+    string_types = soup.interesting_string_types
+    
+    walk_start = time.perf_counter() if profile is not None else None
+    for element in soup.descendants:
+        tag_name = element.name
+        if tag_name is None:
+            if type(element) in string_types:
+                strings.append(element)
+            continue
         
-        # If no email found in imMail spans, try regex on the entire page
-        if not result["email"]:
-            email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-            page_text = soup.get_text()
-            email_matches = re.findall(email_pattern, page_text)
-            if email_matches:
-                result["email"] = email_matches[0]
+        # Content of a section whose heading we have already passed
+        if waiting:
+            for entry in [entry for entry in waiting if entry[0] == tag_name]:
+                waiting.remove(entry)
+                timed(profile, entry[1], parse_section, element, entry[1], result)
         
-        return result
+        if tag_name == 'h3':
+            section = SECTIONS.get(element.string)
+            if section and element.string not in headings_found:
+                headings_found.add(element.string)
+                waiting.append(section)
+        elif tag_name == 'div':
+            if not desc_found and has_class(element, 'desc'):
+                desc_found = True
+                result.description = timed(profile, 'description', extract_text_from_element, element)
+            if has_class(element, 'contact'):
+                timed(profile, 'contact', parse_contact, element, result)
+        elif tag_name == 'img' and not img_found and has_class(element, 'img-responsive'):
+            # Extract image URL, downloaded by the caller
+            img_found = True
+            if 'src' in element.attrs:
+                image_url = element['src']
+                if image_url.startswith('/'):
+                    image_url = fetch.site_url(image_url)
+    if profile is not None:
+        profile['walk'] = profile.get('walk', 0.0) + time.perf_counter() - walk_start
+    
+    # If no email found in imMail spans, try regex on the entire page
+    if not result.email:
+        email_match = timed(profile, 'email_fallback', EMAIL_PATTERN.search, ''.join(strings))
+        if email_match:
+            result.email = email_match.group(0)
+    
+    # The record holds plain strings, so the tree can go now
+    parsing.release(soup)
+    return result, image_url
+
+# Set by main(): the site's person pages, so profile URLs are looked up rather than guessed
+_slug_index = None
+
+def person_url(name):
+    slug = _slug_index.names.get(name) if _slug_index is not None else None
+    return fetch.site_url("/person/") + (slug or clean_name(name)) + "/"
+
+def fetch_person(name, image_dir, state=None):
+    """Fetch stage: download a person page as (name, previous record, body, encoding).
+    
+    If the page is unchanged since the last incremental run, the previous
+    record comes back instead of the body.
+    """
+    try:
+        body, encoding = fetch.get_body(person_url(name))
+    except requests.exceptions.HTTPError as e:
+        # The indexed page is gone: have the next run look for it again
+        if _slug_index is not None and e.response is not None and e.response.status_code == 404:
+            _slug_index.forget(name)
+        raise
+    
+    # Reuse the previous record if the page has not changed
+    if state is not None:
+        page_fingerprint = incremental.fingerprint(body)
+        state.remember(page_fingerprint, name)
+        previous = state.lookup(page_fingerprint, image_dir)
+        if previous:
+            return name, previous, None, None
+    return name, None, body, encoding
+
+def parse_person(payload):
+    """Parse stage: turn fetch_person()'s payload into a Person and photo URL; runs in any process."""
+    name, previous, body, encoding = payload
+    if previous:
+        return records.Person.from_dict(previous), ""
+    return parse_person_page(parsing.decode(body, encoding), name)
+
+def finish_person(name, result, image_url, image_dir):
+    if image_url:
+        image_filename = download_image(image_url, name, image_dir)
+        if image_filename:
+            result.image = image_filename
+    # A malformed contact field is dropped, not the whole person
+    for problem in result.drop_malformed():
+        print(f"Ignoring {name}'s {problem}")
+    return result.validate()
+
+def scrape_person_info(name, image_dir, state=None):
+    try:
+        result, image_url = parse_person(fetch_person(name, image_dir, state))
+        return finish_person(name, result, image_url, image_dir)
     
     except requests.exceptions.RequestException as e:
         print(f"Error scraping {name}: {e}")
         return None
+    except records.InvalidRecord as e:
+        print(f"Skipping {name}: {e}")
+        return None
 
-def main():
+def scrape_member(member, image_dir, state):
+    # Run in a worker thread: never let one person's failure escape
+    print(f"Scraping information for {member['name']}...")
+    try:
+        return scrape_person_info(member['name'], image_dir, state)
+    except Exception as e:
+        print(f"Unexpected error scraping {member['name']}: {e}")
+        return None
+
+def scrape_members_threaded(members, image_dir, state, workers):
+    """Yield each member's Person (or None), fetching and parsing in `workers` threads."""
+    # map() keeps results in input order
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(lambda m: scrape_member(m, image_dir, state), members)
+
+def scrape_members_pipelined(members, image_dir, state, workers, parse_workers):
+    """Yield each member's Person (or None), parsing pages in worker processes.
+    
+    Pages download in `workers` threads while `parse_workers` processes
+    parse the ones already fetched; photos are then downloaded in threads.
+    """
+    def fetch_member(member):
+        print(f"Scraping information for {member['name']}...")
+        return fetch_person(member['name'], image_dir, state)
+    
+    def finish_member(entry):
+        member, outcome = entry
+        name = member['name']
+        if isinstance(outcome, pipeline.Failed):
+            if isinstance(outcome.error, requests.exceptions.RequestException):
+                print(f"Error scraping {name}: {outcome.error}")
+            else:
+                print(f"Unexpected error scraping {name}: {outcome.error}")
+            return None
+        result, image_url = outcome
+        try:
+            return finish_person(name, result, image_url, image_dir)
+        except records.InvalidRecord as e:
+            print(f"Skipping {name}: {e}")
+            return None
+    
+    parsed = pipeline.fetch_and_parse(members, fetch_member, parse_person, workers, parse_workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from pipeline.ordered_map(executor, finish_member, zip(members, parsed), workers * 2)
+
+def main(workers=4, rate=None, incremental_mode=False, variants=None, resume=False,
+         team_path=TEAM_FILE, output_path='team_details.json', image_dir='team_images', tsv_path=None, diff=False,
+         parse_workers=0, slug_max_age=slug_index.MAX_AGE):
+    global _slug_index
     # Create images directory if it doesn't exist
-    image_dir = 'team_images'
     os.makedirs(image_dir, exist_ok=True)
     
     # Load team data
-    with open('src/content/team/team.json', 'r') as f:
+    with open(team_path, 'r') as f:
         team_data = json.load(f)
     
     # Only use current members, not alumni
     current_members = team_data['current']
     
-    # Scrape information for each member
-    results = []
-    for member in current_members:
-        print(f"Scraping information for {member['name']}...")
-        info = scrape_person_info(member['name'], image_dir)
-        if info:
-            results.append(info)
-        time.sleep(0.3)  # Be nice to the server
+    # Load the previous output so unchanged people can be skipped
+    state = incremental.IncrementalState(output_path, enabled=incremental_mode)
+    
+    # Be nice to the server: limit requests per host instead of sleeping
+    # (rate=None keeps the limit a combined run already configured)
+    if rate is not None:
+        fetch.configure(rate_limit=rate, pool_size=max(workers, 1))
+    
+    # Stream each record to disk as soon as it is parsed; on resume skip
+    # the people a crashed run already wrote. The sheet TSV, if asked for,
+    # comes from the same stream
+    with ndjson.RecordWriter(output_path, resume=resume) as writer, \
+            sheets.SheetWriter(records.Person, tsv_path, diff) as sheet:
+        pending = [member for member in current_members if member['name'] not in writer.done]
+        
+        # Only request pages the site is known to have
+        _slug_index = slug_index.SlugIndex(slug_index.index_path(output_path), slug_max_age)
+        found = _slug_index.resolve([member['name'] for member in pending])
+        pending = [member for member in pending if found[member['name']]]
+        # People a resumed run already streamed still belong in the sheet
+        if resume and sheet.enabled:
+            for record in ndjson.read_records(writer.path):
+                sheet.write(records.Person.from_dict(record))
+        
+        # Scrape members concurrently, optionally parsing in other processes
+        if parse_workers:
+            people = scrape_members_pipelined(pending, image_dir, state, workers, parse_workers)
+        else:
+            people = scrape_members_threaded(pending, image_dir, state, workers)
+        for info in people:
+            if info:
+                writer.write(info.to_dict())
+                sheet.write(info)
+        
+        # Save results
+        count = writer.finish()
+        sheet.finish()
+    state.save_fingerprints()
+    _slug_index.save()
+    print(_slug_index.report())
     
-    # Save results
-    with open('team_details.json', 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    # Optional post-download stage: responsive WebP/AVIF versions of the images
+    if variants:
+        image_variants.build_variants(image_dir, avif=variants == 'avif')
     
-    print(f"Scraped information for {len(results)} current team members")
+    print(f"Scraped information for {count} current team members ({state.reused} unchanged)")
+    return count
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape team member pages from saezlab.org")
+    parser.add_argument('--workers', type=int, default=4, help="number of people scraped in parallel (1 = serial)")
+    parser.add_argument('--rate', type=float, default=3.0, help="maximum requests per second per host (0 = no limit)")
+    parser.add_argument('--parse-workers', type=int, default=0, help="parse pages in this many processes while others download (0 = parse in the fetching threads)")
+    parser.add_argument('--team-file', default=TEAM_FILE, help="JSON file listing the current team members")
+    parser.add_argument('--incremental', action='store_true', help="only re-parse people whose page changed since the last run")
+    parser.add_argument('--resume', action='store_true', help="continue an interrupted run from its last written record")
+    parser.add_argument('--variants', choices=['webp', 'avif'], help="also build resized WebP (or WebP and AVIF) variants of the images")
+    parser.add_argument('--slug-max-age', type=float, default=slug_index.MAX_AGE, help="seconds before the index of person pages is refreshed from the sitemap (0 = every run)")
+    fetch.add_arguments(parser)
+    parsing.add_arguments(parser)
+    sheets.add_arguments(parser, records.Person)
+    args = parser.parse_args()
+    fetch.setup_logging()
+    fetch.configure_from_args(args)
+    parsing.configure_from_args(args)
+    main(workers=args.workers, rate=args.rate, incremental_mode=args.incremental, variants=args.variants,
+         resume=args.resume, team_path=args.team_file, tsv_path=args.tsv, diff=args.diff,
+         parse_workers=args.parse_workers, slug_max_age=args.slug_max_age)
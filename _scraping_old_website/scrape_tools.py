@@ -1,174 +1,224 @@
-import json
+import argparse
 import requests
-from bs4 import BeautifulSoup
-import re
 import os
 from urllib.parse import urlparse
-import time
+
+import fetch
+import image_variants
+import images
+import incremental
+import ndjson
+import parsing
+import records
+import sheets
+import slugs
+import tracing
 
 def clean_name(name):
-    # Convert to lowercase
-    name = name.lower()
-    
-    # Replace spaces with hyphens
-    name = '-'.join(name.split())
-    
-    # Remove any special characters except hyphens
-    name = re.sub(r'[^a-z0-9-]', '', name)
-    
-    return name
+    # Slug used for profile URLs and image filenames
+    return slugs.slugify(name)
 
-def download_image(url, name, image_dir):
-    if not url:
-        return None
-    
-    try:
-        # Get the file extension from the URL
-        parsed_url = urlparse(url)
-        file_ext = os.path.splitext(parsed_url.path)[1]
-        if not file_ext:
-            file_ext = '.png'  # Default extension if none found
-        
-        # Create filename from tool's name
-        filename = f"{clean_name(name)}{file_ext}"
-        filepath = os.path.join(image_dir, filename)
-        
-        # Download the image
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        
-        # Save the image
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        return filename
-    
-    except Exception as e:
-        print(f"Error downloading image for {name}: {e}")
-        return None
+def image_filename(url, name):
+    # Name the file after the tool, keeping the extension from the URL
+    file_ext = os.path.splitext(urlparse(url).path)[1]
+    if not file_ext:
+        file_ext = '.png'  # Default extension if none found
+    return f"{clean_name(name)}{file_ext}"
+
+def download_images(tools, image_dir, workers=4):
+    """Download the icons of (tool, image_url) pairs in one batch and set tool.image.
+
+    Downloads run `workers` at a time; fetch's per-host rate limit spaces
+    them out.
+    """
+    batch = [(tool, url) for tool, url in tools if url]
+    if not batch:
+        return
+    print(f"Downloading {len(batch)} tool images...")
+    store = images.get_store(image_dir)
+    filenames = store.save_many([(url, image_filename(url, tool.name)) for tool, url in batch], workers)
+    for (tool, _), filename in zip(batch, filenames):
+        if filename:
+            tool.image = filename
 
 def extract_text_from_element(element):
     if element:
         return element.get_text(strip=True)
     return ""
 
-def scrape_tool_info(resource_div, image_dir):
-    try:
-        # Initialize result dictionary
-        result = {
-            "name": "",
-            "short_description": "",
-            "long_description": "",
-            "code_repository": "",
-            "website": "",
-            "publication": "",
-            "image": "",
-            "categories": {
-                "featured": False,
-                "tool": False,
-                "database": False
-            }
-        }
-        
-        # Extract name
-        name_elem = resource_div.find('h3')
-        if name_elem:
-            result["name"] = extract_text_from_element(name_elem)
-        
-        # Extract short description
-        desc_elem = resource_div.find('p')
-        if desc_elem:
-            result["short_description"] = extract_text_from_element(desc_elem)
-        
-        # Extract image
-        img = resource_div.find('img', class_='icon')
-        if img and 'src' in img.attrs:
-            image_url = img['src']
-            if image_url.startswith('/'):
-                image_url = 'https://saezlab.org' + image_url
-            image_filename = download_image(image_url, result["name"], image_dir)
-            if image_filename:
-                result["image"] = image_filename
-        
-        # Extract detailed information from the hidden div
-        hidden_div = resource_div.find('div', class_='hidden')
-        if hidden_div:
-            # Extract long description
-            desc_p = hidden_div.find('p')
-            if desc_p:
-                result["long_description"] = extract_text_from_element(desc_p)
-            
-            # Extract links from the table
-            table = hidden_div.find('table')
-            if table:
-                # Find the data row (second row)
-                rows = table.find_all('tr')
-                if len(rows) >= 2:
-                    data_row = rows[1]  # Get the second row which contains the actual data
-                    cols = data_row.find_all('td')
-                    
-                    # Process each column based on its position
-                    for i, col in enumerate(cols):
-                        link = col.find('a')
-                        if link and 'href' in link.attrs:
-                            href = link['href']
-                            if i == 0:  # First column is code repository
-                                result["code_repository"] = href
-                            elif i == 1:  # Second column is website
-                                result["website"] = href
-                            elif i == 2:  # Third column is publication
-                                result["publication"] = href
-        
-        # Determine categories based on the comment in the hidden div
-        comment = hidden_div.find(text=lambda text: isinstance(text, str) and 'array' in text)
-        if comment:
-            if 'database' in comment:
-                result["categories"]["database"] = True
-            if 'tool' in comment:
-                result["categories"]["tool"] = True
-        
-        return result
+@tracing.extracts
+def parse_tool_info(resource_div):
+    """Parse a resource block into a records.Tool and the URL of its icon."""
+    result = records.Tool(name="")
+    
+    # Extract name
+    name_elem = resource_div.find('h3')
+    if name_elem:
+        result.name = extract_text_from_element(name_elem)
+    
+    # Extract short description
+    desc_elem = resource_div.find('p')
+    if desc_elem:
+        result.short_description = extract_text_from_element(desc_elem)
+    
+    # Extract image URL, downloaded by the caller
+    image_url = ""
+    img = resource_div.find('img', class_='icon')
+    if img and 'src' in img.attrs:
+        image_url = img['src']
+        if image_url.startswith('/'):
+            image_url = fetch.site_url(image_url)
+    
+    # Extract detailed information from the hidden div
+    hidden_div = resource_div.find('div', class_='hidden')
+    if hidden_div:
+        # Extract long description
+        desc_p = hidden_div.find('p')
+        if desc_p:
+            result.long_description = extract_text_from_element(desc_p)
+    
+        # Extract links from the table
+        table = hidden_div.find('table')
+        if table:
+            # Find the data row (second row)
+            rows = table.find_all('tr')
+            if len(rows) >= 2:
+                data_row = rows[1]  # Get the second row which contains the actual data
+                cols = data_row.find_all('td')
+    
+                # Process each column based on its position
+                for i, col in enumerate(cols):
+                    link = col.find('a')
+                    if link and 'href' in link.attrs:
+                        href = link['href'].strip()
+                        if i == 0:  # First column is code repository
+                            result.code_repository = href
+                        elif i == 1:  # Second column is website
+                            result.website = href
+                        elif i == 2:  # Third column is publication
+                            result.publication = href
     
-    except Exception as e:
-        print(f"Error scraping tool information: {e}")
-        return None
+    # Determine categories based on the comment in the hidden div
+    comment = hidden_div.find(text=lambda text: isinstance(text, str) and 'array' in text)
+    if comment:
+        if 'database' in comment:
+            result.categories["database"] = True
+        if 'tool' in comment:
+            result.categories["tool"] = True
+    
+    return result, image_url
+
+def parse_resources(resource_divs, state, image_dir):
+    """Parse every resource block without touching the network.
+
+    Returns a list of (fingerprint, previous, tool, image_url). For a block
+    unchanged since the last incremental run, previous is the old JSON
+    record and nothing needs downloading; otherwise tool is the new
+    records.Tool (None if the block could not be parsed).
+    """
+    parsed = []
+    for resource_div in resource_divs:
+        # Reuse the previous record if the resource block has not changed
+        block_fingerprint = incremental.fingerprint(str(resource_div))
+        previous = state.lookup(block_fingerprint, image_dir)
+        if previous:
+            parsed.append((block_fingerprint, previous, records.Tool.from_dict(previous), ""))
+            continue
+        
+        try:
+            tool, image_url = parse_tool_info(resource_div)
+        except Exception as e:
+            print(f"Error scraping tool information: {e}")
+            tool, image_url = None, ""
+        parsed.append((block_fingerprint, None, tool, image_url))
+    return parsed
+
+def find_resources(html):
+    """Return the resource blocks of the homepage HTML."""
+    soup = parsing.make_soup(html, 'tools')
+    return soup.find_all('div', class_='resource')
 
-def main():
+def main(incremental_mode=False, variants=None, output_path='tools_details.json', image_dir='tool_images',
+         tsv_path=None, diff=False, workers=4, rate=None):
     # Create images directory if it doesn't exist
-    image_dir = 'tool_images'
     os.makedirs(image_dir, exist_ok=True)
     
+    # Load the previous output so unchanged tools can be skipped
+    state = incremental.IncrementalState(output_path, enabled=incremental_mode)
+    
+    # Be nice to the server: limit requests per host instead of sleeping
+    # (rate=None keeps the limit a combined run already configured)
+    if rate is not None:
+        fetch.configure(rate_limit=rate, pool_size=max(workers, 1))
+    
     # URL of the tools page
-    url = "https://saezlab.org#tools"
+    url = fetch.site_url("#tools")
     
     try:
-        # Get the page content
-        response = requests.get(url)
+        # Get the page content, shared with scrape_alumni in a combined run
+        response = fetch.get_shared(url)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
         
-        # Initialize results list
-        results = []
+        # Everything but the icons is on this one page: parse all of it
+        # first, then fetch the icons together
+        resource_divs = find_resources(response.text)
+        resources = parse_resources(resource_divs, state, image_dir)
+        # The records hold plain strings: free the page's tree before the downloads
+        if resource_divs:
+            parsing.release(resource_divs[0])
+        download_images([(tool, image_url) for _, _, tool, image_url in resources if tool], image_dir, workers)
         
-        # Find all resource divs
-        resource_divs = soup.find_all('div', class_='resource')
-        
-        for resource_div in resource_divs:
-            print(f"Scraping information for resource...")
-            info = scrape_tool_info(resource_div, image_dir)
-            if info:
-                results.append(info)
-            time.sleep(0.3)  # Be nice to the server
+        # Stream the records to disk, and to the sheet TSV if asked
+        with ndjson.RecordWriter(output_path) as writer, sheets.SheetWriter(records.Tool, tsv_path, diff) as sheet:
+            for block_fingerprint, previous, tool, _ in resources:
+                if previous:
+                    state.remember(block_fingerprint, previous['name'])
+                    writer.write(previous)
+                    sheet.write(tool)
+                    continue
+                if tool is None:
+                    continue
+                # A malformed link is dropped, not the whole tool
+                for problem in tool.drop_malformed():
+                    print(f"Ignoring {tool.name}'s {problem}")
+                try:
+                    tool.validate()
+                except records.InvalidRecord as e:
+                    print(f"Skipping tool: {e}")
+                    continue
+                state.remember(block_fingerprint, tool.name)
+                writer.write(tool.to_dict())
+                sheet.write(tool)
+            
+            # Save results
+            count = writer.finish()
+            sheet.finish()
+        state.save_fingerprints()
         
-        # Save results
-        with open('tools_details.json', 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        # Optional post-download stage: responsive WebP/AVIF versions of the images
+        if variants:
+            image_variants.build_variants(image_dir, avif=variants == 'avif')
         
-        print(f"Scraped information for {len(results)} tools")
+        print(f"Scraped information for {count} tools ({state.reused} unchanged)")
+        return count
     
     except requests.exceptions.RequestException as e:
         print(f"Error accessing the website: {e}")
+    return None
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape the tools and resources from saezlab.org")
+    parser.add_argument('--workers', type=int, default=4, help="number of images downloaded in parallel")
+    parser.add_argument('--rate', type=float, default=3.0, help="maximum requests per second per host (0 = no limit)")
+    parser.add_argument('--incremental', action='store_true', help="only re-parse tools whose block changed since the last run")
+    parser.add_argument('--variants', choices=['webp', 'avif'], help="also build resized WebP (or WebP and AVIF) variants of the images")
+    fetch.add_arguments(parser)
+    parsing.add_arguments(parser)
+    sheets.add_arguments(parser, records.Tool)
+    args = parser.parse_args()
+    fetch.setup_logging()
+    fetch.configure_from_args(args)
+    parsing.configure_from_args(args)
+    main(incremental_mode=args.incremental, variants=args.variants, tsv_path=args.tsv, diff=args.diff,
+         workers=args.workers, rate=args.rate)
+ 
\ No newline at end of file
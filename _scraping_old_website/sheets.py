@@ -0,0 +1,151 @@
+"""Sheet-ready TSV written straight from the scrapers' record stream.
+
+The scrapers hand each record to a SheetWriter as they write it to JSON,
+so the TSV that is pasted into the Google Sheets feeding the site no
+longer needs the Node exporters in _scripts/ to re-read the JSON. The
+output is byte-compatible with theirs. Columns the scrapers cannot fill,
+like a person's role or a tool's "featured" flag, are carried over from
+the existing TSV.
+
+In diff mode nothing is written; the rows that differ from the existing
+TSV are printed instead.
+"""
+import csv
+import os
+
+import records
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SHEETS_DIR = os.path.join(HERE, '..', '_scripts')
+SHEET_FILES = {
+    records.Person: 'team_current.tsv',
+    records.Alumnus: 'team_alumni.tsv',
+    records.Tool: 'software.tsv',
+}
+SHOW_CHARS = 80  # longest value shown in a diff line
+
+
+def default_path(cls):
+    return os.path.join(SHEETS_DIR, SHEET_FILES[cls])
+
+
+def _unique_keys(keys):
+    # Repeated names (a tool listed twice) become "name", "name #2", ...
+    seen = {}
+    for key in keys:
+        seen[key] = seen.get(key, 0) + 1
+        yield key if seen[key] == 1 else f"{key} #{seen[key]}"
+
+
+def read_rows(path, key):
+    """Return the rows of a TSV file as key -> {header: text}, or {} if it is missing."""
+    try:
+        with open(path, encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f, delimiter='\t'))
+    except FileNotFoundError:
+        return {}
+    return dict(zip(_unique_keys(row[key] for row in rows), rows))
+
+
+def _show(value):
+    value = repr(value)
+    return value if len(value) <= SHOW_CHARS else value[:SHOW_CHARS - 3] + '...'
+
+
+def print_diff(previous, current):
+    """Print the rows of `current` that differ from `previous`; return how many did."""
+    # Printed in one go so concurrent scrapers don't interleave their diffs
+    lines = []
+    changes = 0
+    for key, row in current.items():
+        old = previous.get(key)
+        if old is None:
+            lines.append(f"+ {key}")
+            changes += 1
+            continue
+        changed = [header for header, value in row.items() if old.get(header, '') != value]
+        if changed:
+            lines.append(f"~ {key}")
+            for header in changed:
+                lines.append(f"    {header}: {_show(old.get(header, ''))} -> {_show(row[header])}")
+            changes += 1
+    for key in previous:
+        if key not in current:
+            lines.append(f"- {key}")
+            changes += 1
+    if lines:
+        print('\n'.join(lines))
+    return changes
+
+
+class SheetWriter:
+    """Stream records of type `cls` to the sheet TSV at `path`, or diff against it.
+
+    With neither a path nor diff mode the writer does nothing, so scrapers
+    can always use one.
+    """
+
+    def __init__(self, cls, path=None, diff=False):
+        self.cls = cls
+        self.enabled = path is not None or diff
+        self.path = os.path.normpath(path or default_path(cls))
+        self.diff = diff
+        self.previous = read_rows(self.path, cls.KEY) if self.enabled else {}
+        self.rows = {}  # diff mode: key -> {header: text}
+        self.count = 0
+        self._keys = {}
+        self._file = None
+        if self.enabled and not diff:
+            self._tmp_path = f"{self.path}.tmp"
+            self._file = open(self._tmp_path, 'w', encoding='utf-8', newline='')
+            self._file.write('\t'.join(cls.headers()))
+
+    def _key(self, record):
+        key = getattr(record, self.cls.KEY)
+        self._keys[key] = self._keys.get(key, 0) + 1
+        return key if self._keys[key] == 1 else f"{key} #{self._keys[key]}"
+
+    def write(self, record):
+        if not self.enabled:
+            return
+        key = self._key(record)
+        row = record.sheet_row(self.previous.get(key))
+        if self.diff:
+            self.rows[key] = {header: str(value) for header, value in row.items()}
+        else:
+            self._file.write('\n' + '\t'.join(records.escape_tsv(value) for value in row.values()))
+        self.count += 1
+
+    def finish(self):
+        """Replace the TSV with the new rows, or print the diff; return rows written or changed."""
+        if not self.enabled:
+            return 0
+        if self.diff:
+            changes = print_diff(self.previous, self.rows)
+            print(f"{changes} of {self.count} rows differ from {self.path}")
+            return changes
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        print(f"Wrote {self.count} rows to {self.path}")
+        return self.count
+
+    def close(self):
+        # An unfinished export leaves the existing TSV alone
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def add_arguments(parser, cls):
+    """Add --tsv and --diff for a scraper producing records of type `cls`."""
+    group = parser.add_argument_group("sheet export")
+    group.add_argument('--tsv', nargs='?', const=default_path(cls), metavar='PATH',
+                       help=f"also write sheet-ready TSV (default path: _scripts/{SHEET_FILES[cls]})")
+    group.add_argument('--diff', action='store_true',
+                       help="print the rows that differ from the existing TSV instead of writing it")
@@ -0,0 +1,259 @@
+"""Index of the person pages that exist on the site, for scrape_team.
+
+Instead of guessing each profile URL from the person's name and paying a
+404 when the guess is wrong, scrape_team looks names up here. The index
+is built from the site's sitemap (following nested sitemaps), or, if
+there is none, from the /person/ links on the person listing and the
+homepage, which also give the name each page is listed under.
+
+A name resolves, in order, to:
+- its entry in slug_overrides.json
+- the slug it resolved to on an earlier run
+- the page whose slug or listed name is its slugified form
+- the best fuzzy match: all name words found in the slug ("Jan Lanzer"
+  -> jan-david-lanzer), or failing that the closest slug by
+  difflib ratio, if it clears FUZZY_THRESHOLD and no other page ties
+
+The index is kept next to the scraper output (``team_details.slugs.json``
+for ``team_details.json``). It is refreshed when older than --slug-max-age,
+when a name it has not seen before cannot be resolved, or after a known
+page returned 404. A refresh adds the new pages and drops the vanished
+ones, but names already resolved to pages that still exist are not
+matched again. Names nothing matches are reported and skipped without a
+request.
+"""
+import difflib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+import requests
+
+import fetch
+import parsing
+import slugs
+from incremental import write_json_atomic
+
+SITEMAPS = ('/sitemap.xml', '/sitemap_index.xml', '/wp-sitemap.xml')
+LISTINGS = ('/person/', '/')
+PERSON_PATH = re.compile(r'/person/([^/?#]+)/?$')
+LOC = re.compile(r'<loc>\s*([^<\s]+)\s*</loc>')
+MAX_SITEMAPS = 50  # nested sitemaps followed per refresh
+MAX_AGE = 7 * 24 * 3600
+FUZZY_THRESHOLD = 0.8
+
+
+def index_path(output_path):
+    root, _ = os.path.splitext(output_path)
+    return f"{root}.slugs.json"
+
+
+def person_slug(url):
+    match = PERSON_PATH.search(urlparse(url).path)
+    return match.group(1) if match else None
+
+
+def _get_text(url):
+    # Missing sitemaps and listings are expected, so don't treat them as errors
+    try:
+        response = fetch.get(url)
+    except requests.exceptions.RequestException as e:
+        print(f"Could not fetch {url}: {e}")
+        return None
+    return response.text if response.ok else None
+
+
+def _crawl_sitemap(url):
+    # Returns ({slug: ''}, whether the sitemap exists at all)
+    pages = {}
+    todo = [url]
+    seen = set()
+    exists = False
+    while todo and len(seen) < MAX_SITEMAPS:
+        url = todo.pop(0)
+        if url in seen:
+            continue
+        seen.add(url)
+        text = _get_text(url)
+        if not text:
+            continue
+        exists = True
+        for loc in LOC.findall(text):
+            if urlparse(loc).path.endswith('.xml'):
+                todo.append(loc)  # a sitemap index pointing at more sitemaps
+            elif person_slug(loc):
+                pages[person_slug(loc)] = ''
+    return pages, exists
+
+
+def discover_sitemap():
+    """Return {slug: ''} for the person pages listed in the site's sitemap."""
+    for path in SITEMAPS:
+        pages, exists = _crawl_sitemap(fetch.site_url(path))
+        if exists:
+            return pages
+    return {}
+
+
+def discover_listing():
+    """Return {slug: listed name} from the /person/ links on the listing pages."""
+    pages = {}
+    for path in LISTINGS:
+        text = _get_text(fetch.site_url(path))
+        if not text:
+            continue
+        soup = parsing.make_soup(text)
+        for link in soup.find_all('a', href=True):
+            slug = person_slug(link['href'])
+            if slug and not pages.get(slug):
+                pages[slug] = link.get_text(' ', strip=True)
+        parsing.release(soup)
+        if pages:
+            break
+    return pages
+
+
+def _words(slug):
+    return set(slug.split('-'))
+
+
+def match_score(name, slug, label=''):
+    """Return how likely the page `slug`, listed as `label`, is the profile of `name`."""
+    target = slugs.slugify(name)
+    candidates = [slug] + ([slugs.slugify(label)] if label else [])
+    if target in candidates:
+        return 1.0
+    wanted = _words(target)
+    best = 0.0
+    for candidate in candidates:
+        # A middle name added or dropped: every word of the shorter one is in the other
+        have = _words(candidate)
+        if len(wanted & have) >= 2 and (wanted <= have or have <= wanted):
+            best = max(best, 0.9)
+        best = max(best, difflib.SequenceMatcher(None, target, candidate).ratio())
+    return best
+
+
+class SlugIndex:
+    """Persisted name -> slug index of the site's person pages."""
+
+    def __init__(self, path, max_age=MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.pages = {}  # slug -> listed name ('' when only the sitemap knows it)
+        self.names = {}  # name -> slug it resolved to
+        self.unmatched = set()  # names no page matched since the last refresh
+        self.refreshed_at = 0.0
+        self.refreshed = False  # refreshed during this run
+        self.stats = Counter()
+        self.missing = []
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # An index of another site (say, a fixture server) is no use here
+        if data.get('base_url') == fetch.site_url():
+            self.pages = data.get('pages', {})
+            self.names = data.get('names', {})
+            self.unmatched = set(data.get('unmatched', []))
+            self.refreshed_at = data.get('refreshed_at', 0.0)
+
+    def save(self):
+        write_json_atomic(self.path, {
+            'base_url': fetch.site_url(),
+            'refreshed_at': self.refreshed_at,
+            'pages': self.pages,
+            'names': self.names,
+            'unmatched': sorted(self.unmatched),
+        })
+
+    def stale(self):
+        return not self.pages or time.time() - self.refreshed_at > self.max_age
+
+    def refresh(self):
+        """Merge the pages found on the site into the index; returns how many were new."""
+        found = discover_sitemap() or discover_listing()
+        self.refreshed = True
+        if not found:
+            print("Slug index: found no person pages on the site")
+            return 0
+        added = [slug for slug in found if slug not in self.pages]
+        for slug, label in found.items():
+            self.pages[slug] = label or self.pages.get(slug, '')
+        # Pages that are gone take the names resolved to them along
+        for slug in set(self.pages) - set(found):
+            del self.pages[slug]
+        self.names = {name: slug for name, slug in self.names.items() if slug in self.pages}
+        self.unmatched.clear()
+        self.refreshed_at = time.time()
+        print(f"Slug index: {len(self.pages)} person pages ({len(added)} new)")
+        return len(added)
+
+    def match(self, name):
+        """Return (slug, how it was found) for `name`, or (None, 'miss')."""
+        if name in slugs.OVERRIDES:
+            return slugs.OVERRIDES[name], 'override'
+        if name in self.names:
+            return self.names[name], 'known'
+        target = slugs.slugify(name)
+        if target in self.pages:
+            return target, 'exact'
+        scored = sorted(((match_score(name, slug, label), slug) for slug, label in self.pages.items()), reverse=True)
+        if scored and scored[0][0] == 1.0:
+            return scored[0][1], 'exact'
+        if scored and scored[0][0] >= FUZZY_THRESHOLD and (len(scored) == 1 or scored[1][0] < scored[0][0]):
+            return scored[0][1], 'fuzzy'
+        return None, 'miss'
+
+    def resolve(self, names):
+        """Return {name: slug or None}, refreshing the index once if it is stale or a name is missing."""
+        if self.stale():
+            self.refresh()
+        if not self.pages:
+            # Nothing to go on: fall back to guessing, as before the index
+            self.stats['guessed'] += len(names)
+            return {name: slugs.slugify(name) for name in names}
+        found = {}
+        kinds = {}
+        for name in names:
+            found[name], kinds[name] = self.match(name)
+        # A name new to the index may be a page added since the last
+        # refresh; one that already missed waits for the index to go stale
+        misses = [name for name in names if kinds[name] == 'miss']
+        if any(name not in self.unmatched for name in misses) and not self.refreshed and self.refresh():
+            for name in misses:
+                found[name], kinds[name] = self.match(name)
+        for name in names:
+            self.stats[kinds[name]] += 1
+            if found[name]:
+                self.names[name] = found[name]
+            else:
+                self.unmatched.add(name)
+                self.missing.append(name)
+        return found
+
+    def forget(self, name):
+        """Drop the slug of `name` after its page turned out to be gone; the next run refreshes."""
+        with self._lock:
+            slug = self.names.pop(name, None)
+            if slug is not None:
+                self.pages.pop(slug, None)
+                self.refreshed_at = 0.0
+
+    def report(self):
+        counts = ', '.join(f"{count} {kind}" for kind, count in sorted(self.stats.items()))
+        total = sum(self.stats.values())
+        hits = total - self.stats['miss']
+        line = f"Slug index: {hits}/{total} names resolved ({counts or 'none'})"
+        if self.missing:
+            line += f"; no page for {', '.join(self.missing)}"
+        return line
@@ -0,0 +1,56 @@
+"""URL and filename slugs for people and tools, shared by the scrapers."""
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+OVERRIDES_PATH = os.path.join(HERE, 'slug_overrides.json')
+
+# Explicit ASCII spellings; anything else non-ASCII goes through NFKD folding
+CHAR_MAP = {
+    'ä': 'a', 'ö': 'o', 'ü': 'u', 'ß': 'ss', 'ñ': 'n',
+    'é': 'e', 'è': 'e', 'ê': 'e', 'ë': 'e',
+    'á': 'a', 'à': 'a', 'â': 'a', 'ã': 'a', 'å': 'a',
+    'ç': 'c',
+    'í': 'i', 'ì': 'i', 'î': 'i', 'ï': 'i',
+    'ó': 'o', 'ò': 'o', 'ô': 'o', 'õ': 'o',
+    'ú': 'u', 'ù': 'u', 'û': 'u',
+    'ý': 'y', 'ÿ': 'y',
+    'æ': 'ae', 'œ': 'oe', 'ø': 'o', 'ł': 'l',
+    'ń': 'n', 'ś': 's', 'ź': 'z', 'ż': 'z', 'ć': 'c', 'ę': 'e', 'ą': 'a',
+    'š': 's', 'č': 'c', 'ž': 'z', 'đ': 'd',
+}
+TRANSLATION = str.maketrans(CHAR_MAP)
+NON_ASCII = re.compile(r'[^\x00-\x7f]')
+DISALLOWED = re.compile(r'[^a-z0-9\s-]')
+
+
+def load_overrides(path=OVERRIDES_PATH):
+    """Names whose slug on the site does not follow from the name itself."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+OVERRIDES = load_overrides()
+
+
+def _fold(char):
+    # NFKD splits off combining accents, which the ASCII encode then drops
+    return unicodedata.normalize('NFKD', char.group(0)).encode('ascii', 'ignore').decode('ascii')
+
+
+@lru_cache(maxsize=4096)
+def slugify(name):
+    """Return the saezlab.org slug for a person or tool name."""
+    if name in OVERRIDES:
+        return OVERRIDES[name]
+    slug = name.lower().translate(TRANSLATION)
+    if not slug.isascii():
+        slug = NON_ASCII.sub(_fold, slug)
+    slug = DISALLOWED.sub('', slug)
+    return '-'.join(slug.split())
@@ -0,0 +1,201 @@
+"""Optional per-request timing for scraper runs.
+
+With --trace FILE every request is broken down into connect (DNS and
+TCP), tls, ttfb (waiting for the response headers) and transfer, and the
+BeautifulSoup work on its page into parse (building the tree) and extract
+(reading the fields out of it). Each span carries the URL, status and byte
+count. At exit the spans are written as Chrome trace JSON, which opens in
+chrome://tracing or https://ui.perfetto.dev, and a table of percentiles
+per phase is printed.
+
+When tracing is off every hook is a single check of `active`.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+import urllib3.connection
+
+PHASES = ('connect', 'tls', 'ttfb', 'transfer', 'parse', 'extract')
+
+active = False
+_events = []  # Chrome trace "complete" events
+_lock = threading.Lock()
+_local = threading.local()  # per thread: connection timings and the page being handled
+_start = time.perf_counter()
+
+
+def _timed_connection_step(step, original):
+    # Adds the time of a urllib3 connection step to the running request
+    @functools.wraps(original)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            steps = getattr(_local, 'steps', None)
+            if steps is not None:
+                steps[step] = steps.get(step, 0.0) + time.perf_counter() - start
+    return wrapper
+
+
+def enable():
+    """Start recording; patches urllib3 so connection setup can be timed."""
+    global active
+    if active:
+        return
+    connection = urllib3.connection
+    # _new_conn opens the socket (DNS and TCP); HTTPS connect() adds the handshake
+    connection.HTTPConnection._new_conn = _timed_connection_step('socket', connection.HTTPConnection._new_conn)
+    connection.HTTPSConnection.connect = _timed_connection_step('https', connection.HTTPSConnection.connect)
+    active = True
+
+
+def _add(name, start, duration, args):
+    event = {
+        'name': name,
+        'cat': 'scrape',
+        'ph': 'X',
+        'ts': (start - _start) * 1e6,
+        'dur': duration * 1e6,
+        'pid': os.getpid(),
+        'tid': threading.get_ident(),
+        'args': args,
+    }
+    with _lock:
+        _events.append(event)
+
+
+def begin_request():
+    """Call before sending a request; returns its start time."""
+    _local.steps = {}
+    return time.perf_counter()
+
+
+def end_request(url, start, response=None, size=None, error=None):
+    """Split the request started at `start` into phases and record them.
+
+    For a streamed response the body has not been read yet, so its
+    transfer (time and bytes) is recorded by record_transfer() instead.
+    """
+    end = time.perf_counter()
+    steps = _local.steps
+    _local.steps = None
+    _local.url = url
+    socket_time = steps.get('socket', 0.0)
+    tls_time = max(steps.get('https', socket_time) - socket_time, 0.0)
+    args = {'url': url}
+    if response is None:
+        args['error'] = str(error)
+        headers_at = end
+    else:
+        args.update(status=response.status_code, bytes=size)
+        # requests measures `elapsed` up to the parsed headers, before reading the body
+        headers_at = min(start + response.elapsed.total_seconds(), end)
+    ttfb = max(headers_at - start - socket_time - tls_time, 0.0)
+    streamed = response is not None and size is None
+    at = start
+    for name, duration in (('connect', socket_time), ('tls', tls_time), ('ttfb', ttfb),
+                           ('transfer', 0.0 if streamed else end - headers_at)):
+        if duration or name == 'ttfb':
+            _add(name, at, duration, args)
+            at += duration
+
+
+def record_transfer(url, start, status, size):
+    """Record reading a streamed response's body, which began at `start`."""
+    _add('transfer', start, time.perf_counter() - start,
+         {'url': url, 'status': status, 'bytes': size, 'streamed': True})
+
+
+def record_cache_hit(url):
+    _local.url = url
+    _add('cache', time.perf_counter(), 0.0, {'url': url})
+
+
+def extracts(function):
+    """Record a scraper's parse function as extract time, minus the tree building inside it."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not active:
+            return function(*args, **kwargs)
+        outer = getattr(_local, 'parse_time', None)
+        _local.parse_time = 0.0
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            parse_time = _local.parse_time
+            _local.parse_time = outer
+            # Shift past the parse spans recorded inside so the two don't overlap
+            _add('extract', start + parse_time, max(time.perf_counter() - start - parse_time, 0.0),
+                 {'url': getattr(_local, 'url', None), 'function': function.__name__})
+    return wrapper
+
+
+def record_parse(start):
+    duration = time.perf_counter() - start
+    if getattr(_local, 'parse_time', None) is not None:
+        _local.parse_time += duration
+    _add('parse', start, duration, {'url': getattr(_local, 'url', None)})
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def summary():
+    """Return the percentile table of the recorded phases as text."""
+    with _lock:
+        events = list(_events)
+    lines = [f"{'phase':<10} {'count':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'total s':>8}"]
+    for phase in PHASES:
+        durations = [event['dur'] / 1000 for event in events if event['name'] == phase]
+        if durations:
+            lines.append(f"{phase:<10} {len(durations):>6} {percentile(durations, 0.5):>8.1f} "
+                         f"{percentile(durations, 0.9):>8.1f} {percentile(durations, 0.99):>8.1f} "
+                         f"{max(durations):>8.1f} {sum(durations) / 1000:>8.2f}")
+    requests = {}
+    for event in events:
+        if event['name'] == 'ttfb':
+            status = event['args'].get('status', 'error')
+            requests[status] = requests.get(status, 0) + 1
+    # Buffered bodies are counted on the request, streamed ones once read
+    downloaded = sum(event['args'].get('bytes') or 0 for event in events
+                     if event['name'] == 'ttfb' or event['args'].get('streamed'))
+    cached = sum(1 for event in events if event['name'] == 'cache')
+    statuses = ', '.join(f"{count}x {status}" for status, count in sorted(requests.items(), key=str))
+    lines.append(f"{sum(requests.values())} requests ({statuses or 'none'}), "
+                 f"{downloaded / 1024 / 1024:.2f} MiB, {cached} from cache")
+    return '\n'.join(lines)
+
+
+def write_trace(path):
+    with _lock:
+        events = list(_events)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def finish(path):
+    """Write the trace to `path` and print the summary."""
+    write_trace(path)
+    print(f"\nRequest timings (trace written to {path}):")
+    print(summary())
+
+
+def add_arguments(parser):
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument('--trace', metavar='FILE',
+                       help="time every request and parse, write a Chrome/Perfetto trace to FILE and print a summary")
+
+
+def configure_from_args(args):
+    """Apply the option added by add_arguments(); the trace is written at exit."""
+    if args.trace:
+        enable()
+        atexit.register(finish, args.trace)